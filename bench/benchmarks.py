@@ -0,0 +1,137 @@
+"""Benchmarks of the preset generation.
+
+Every benchmark is a function returning the number of presets and the
+number of bytes it produced.
+"""
+
+import shutil
+import tempfile
+
+from pathlib import Path
+from typing import Callable
+
+from generator.calc import BLOCKS, BlockCalc, GridCalculator, PresetType
+from generator.plugins.grid import GridPreset
+from generator.plugins.pip import PipPreset
+from generator.plugins.slidein import SlideInPreset
+from generator.preset.sweep import sweep
+from generator.preset.writer import LogMode, PresetWriter
+
+GRID_SIZES = [2, 5, 10, 20, 30]
+SIZES = [float(size) for size in range(10, 95, 5)]
+
+Benchmark = Callable[[], tuple[int, int]]
+
+
+class CountSink:
+    """Count the presets and bytes without storing them"""
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.bytes = 0
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        self.files += 1
+        self.bytes += len(preset)
+
+    def close(self) -> None:
+        pass
+
+
+def tmp_dir() -> Path:
+    """Temporary directory, in memory on systems with /dev/shm"""
+    shm = Path("/dev/shm")
+    return Path(tempfile.mkdtemp(dir=shm if shm.is_dir() else None))
+
+
+def bench_calc_block(size: int = 20) -> Benchmark:
+    def run() -> tuple[int, int]:
+        grid = GridCalculator(size, size)
+        count = 0
+        for row in range(size):
+            for col in range(size):
+                for num_row in range(1, size - row + 1):
+                    for num_col in range(1, size - col + 1):
+                        grid.calc_block(row, col, num_row, num_col)
+                        count += 1
+        return count, 0
+
+    return run
+
+
+def bench_calc_spans(size: int = 20) -> Benchmark:
+    def run() -> tuple[int, int]:
+        return len(GridCalculator(size, size).calc_spans()), 0
+
+    return run
+
+
+def bench_block_calc() -> Benchmark:
+    def run() -> tuple[int, int]:
+        count = 0
+        for size in SIZES:
+            calculator = BlockCalc(size)
+            for blocks in BLOCKS.values():
+                for mod in blocks.values():
+                    calculator.calc_block(mod)
+                    count += 1
+        return count, 0
+
+    return run
+
+
+def bench_grid(size: int) -> Benchmark:
+    def run() -> tuple[int, int]:
+        grid = GridPreset(name="Grid")
+        inputs = grid.inputs()
+        inputs[0].value = size
+        inputs[1].value = size
+        sink = CountSink()
+        grid.generate(sink)
+        return sink.files, sink.bytes
+
+    return run
+
+
+def bench_write(preset, params: dict) -> Benchmark:
+    def run() -> tuple[int, int]:
+        output = tmp_dir()
+        try:
+            count = 0
+            size = 0
+            for preset_type in preset.types():
+                preset.active_type = preset_type
+                writer = PresetWriter(
+                    output.as_posix(), LogMode.QUIET, incremental=False
+                )
+                with writer:
+                    for record in sweep(preset, params):
+                        writer.write(*record)
+                count += writer.files
+                size += writer.bytes
+            return count, size
+        finally:
+            shutil.rmtree(output)
+
+    return run
+
+
+def get_benchmarks() -> dict[str, Benchmark]:
+    pip = PipPreset(name="Pip", width=3840, height=2160, size=50.0, padding=32)
+    pip.inputs()
+    slidein = SlideInPreset(
+        name="SlideIn", width=3840, height=2160, size=50.0, fps=30, duration=5, padding=32
+    )
+    slidein.inputs()
+    benchmarks = {
+        "calc_block_20x20": bench_calc_block(20),
+        "calc_spans_20x20": bench_calc_spans(20),
+        "block_calc_corners": bench_block_calc(),
+    }
+    for size in GRID_SIZES:
+        benchmarks[f"grid_{size}x{size}"] = bench_grid(size)
+    benchmarks["pip_write"] = bench_write(pip, {"size": SIZES})
+    benchmarks["slidein_write"] = bench_write(
+        slidein, {"size": SIZES, "fps": [24, 25, 30, 60]}
+    )
+    return benchmarks
@@ -0,0 +1,107 @@
+"""Run the benchmarks and compare them with a stored baseline."""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from bench.benchmarks import Benchmark, get_benchmarks
+
+BASELINE = Path(__file__).parent / Path("baseline.json")
+
+
+@dataclass
+class Result:
+    name: str
+    presets: int
+    bytes: int
+    seconds: float
+    peak_memory: int
+
+    @property
+    def rate(self) -> float:
+        return self.presets / self.seconds if self.seconds else 0.0
+
+
+def measure(name: str, benchmark: Benchmark, repeat: int = 3) -> Result:
+    """Run a benchmark, keep the best time and measure the peak memory once"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        presets, size = benchmark()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    tracemalloc.start()
+    benchmark()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(name, presets, size, best, peak)
+
+
+def compare(
+    results: list[Result], baseline: dict[str, dict], threshold: float
+) -> list[str]:
+    """Return the names of the benchmarks slower than the baseline by more than threshold
+
+    Baselines without a measurable time are too fast to compare and skipped.
+    """
+    regressions = []
+    for result in results:
+        if result.name not in baseline or baseline[result.name]["seconds"] <= 0:
+            continue
+        base_rate = baseline[result.name]["presets"] / baseline[result.name]["seconds"]
+        if result.rate < base_rate * (1 - threshold):
+            regressions.append(result.name)
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    benchmarks = get_benchmarks()
+    parser = argparse.ArgumentParser(
+        prog="python -m bench", description="Benchmark the preset generation"
+    )
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown against the baseline (default: 0.25)",
+    )
+    parser.add_argument("--save", action="store_true", help="save results as baseline")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(benchmarks)
+    if unknown:
+        parser.error(f"unknown benchmarks {sorted(unknown)}, choose from {list(benchmarks)}")
+
+    names = args.names or list(benchmarks)
+    results = []
+    print(f"{'benchmark':<22}{'presets':>10}{'presets/s':>14}{'bytes':>12}{'peak KiB':>10}")
+    for name in names:
+        result = measure(name, benchmarks[name], args.repeat)
+        results.append(result)
+        print(
+            f"{name:<22}{result.presets:>10}{result.rate:>14.0f}"
+            f"{result.bytes:>12}{result.peak_memory / 1024:>10.0f}"
+        )
+
+    if args.save:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())
+        baseline.update({result.name: asdict(result) for result in results})
+        args.baseline.write_text(json.dumps(baseline, indent=2))
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline in {args.baseline}, run with --save to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.threshold)
+    for name in regressions:
+        print(f"regression: {name} is more than {args.threshold:.0%} slower than baseline")
+    return 1 if regressions else 0
@@ -1,7 +1,12 @@
+import os
+
 from pathlib import Path
 
 
 DATA_DIR = Path(__file__).parent.parent / Path("data")
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME", "~/.cache")).expanduser() / Path(
+    "preset_generator"
+)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
+from array import array
 from dataclasses import dataclass
-from typing import Any, Generator, Self
+from typing import Any, Generator, Iterable, Iterator, Self
 from collections import namedtuple
 from enum import IntEnum, StrEnum
-from functools import cached_property
+from functools import lru_cache
+
+from generator.calc.fixed import PERCENT_SCALE, axis_lines, div_round, halves, to_fixed
 
 
 class PresetType(StrEnum):
@@ -44,6 +47,9 @@ MASK_BLOCKS = {
     ),
 }
 
+# the block in the bottom right corner without padding
+CORNER = ModMatrix(dx=0, dy=0, dw=0, dh=0, xadj=1, yadj=1)
+
 SPR_BLOCKS = {
     BlockType.TopLeft: ModMatrix(dx=0, dy=0, dw=-0, dh=0, xadj=0, yadj=0),
     BlockType.TopRight: ModMatrix(dx=-0, dy=0, dw=0, dh=0, xadj=1, yadj=0),
@@ -59,38 +65,51 @@ class BlockCalc:
     height: int = 2160
     padding: int = 32
 
+    # all sizes are fractions of this denominator, see fixed_block
+    DENOMINATOR = 4 * 100 * PERCENT_SCALE
+
     @property
     def prefix_x(self):
-        return ((100 - self.size) / 100) * self.width
+        return div_round(self.fixed_block(CORNER)[0], self.DENOMINATOR)
 
     @property
     def prefix_y(self):
-        return ((100 - self.size) / 100) * self.height
+        return div_round(self.fixed_block(CORNER)[1], self.DENOMINATOR)
 
     @property
     def border(self):
+        # exact, the padding is split in halves
         return self.padding / 2
 
     @property
     def block_width(self):
-        return self.width * (self.size / 100)
+        return div_round(self.fixed_block(CORNER)[2], self.DENOMINATOR)
 
     @property
     def block_height(self):
-        return self.height * (self.size / 100)
+        return div_round(self.fixed_block(CORNER)[3], self.DENOMINATOR)
+
+    def fixed_block(self, mod: ModMatrix) -> tuple[int, int, int, int]:
+        """Exact position and size of a block as numerators over DENOMINATOR
+
+        x = xadj * (100 - size)% of the width + padding / 2 * dx, and
+        w = size% of the width - padding / 2 * dw, y and h alike.
+        """
+        full = 100 * PERCENT_SCALE
+        size = to_fixed(self.size)
+        x = mod.xadj * (full - size) * self.width * 4 + self.padding * halves(mod.dx) * full
+        y = mod.yadj * (full - size) * self.height * 4 + self.padding * halves(mod.dy) * full
+        w = size * self.width * 4 - self.padding * halves(mod.dw) * full
+        h = size * self.height * 4 - self.padding * halves(mod.dh) * full
+        return x, y, w, h
 
     def position(self, mod: ModMatrix):
-        x0 = mod.xadj * self.prefix_x
-        y0 = mod.yadj * self.prefix_y
-        x = x0 + (self.border * mod.dx)
-        y = y0 + (self.border * mod.dy)
-        return x, y
+        x, y, _, _ = self.fixed_block(mod)
+        return div_round(x, self.DENOMINATOR), div_round(y, self.DENOMINATOR)
 
     def calc_block(self, mod: ModMatrix):
-        x, y = self.position(mod)
-        w = self.block_width - (self.border * mod.dw)
-        h = self.block_height - (self.border * mod.dh)
-        return round(x), round(y), round(w), round(h)
+        """Position and size of a block, calculated in fixed-point and rounded once"""
+        return tuple(div_round(value, self.DENOMINATOR) for value in self.fixed_block(mod))
 
     def calc_crop(self, corner: BlockType):
         mod = CROP_BLOCKS[corner]
@@ -105,6 +124,108 @@ class BlockCalc:
         return self.calc_block(mod)
 
 
+BLOCKS = {
+    "crop": CROP_BLOCKS,
+    "mask": MASK_BLOCKS,
+    "spr": SPR_BLOCKS,
+}
+
+
+@lru_cache(maxsize=1024)
+def corner_blocks(
+    size: float, kind: str, width: int = 3840, height: int = 2160, padding: int = 32
+) -> dict[BlockType, tuple[int, int, int, int]]:
+    """Calculate the blocks of a kind in all corners, cached per size"""
+    calculator = BlockCalc(size, width, height, padding)
+    return {corner: calculator.calc_block(mod) for corner, mod in BLOCKS[kind].items()}
+
+
+@dataclass(frozen=True)
+class SpanConstraints:
+    """Limits on the sub-rectangles of a grid
+
+    max_rows and max_columns limit the number of cells of a span, 0 is
+    no limit. aspect_ratios are the allowed width / height ratios of the
+    span in pixels. edge_only keeps the spans touching an edge of the
+    frame and sizes is a whitelist of (num_row, num_col) span sizes.
+    """
+
+    max_rows: int = 0
+    max_columns: int = 0
+    aspect_ratios: tuple[float, ...] = ()
+    edge_only: bool = False
+    sizes: frozenset[tuple[int, int]] = frozenset()
+    tolerance: float = 0.01
+
+    @classmethod
+    def parse(
+        cls,
+        max_rows: int = 0,
+        max_columns: int = 0,
+        aspect: str = "",
+        edge_only: int = 0,
+        spans: str = "",
+    ) -> Self:
+        """Create from input values, aspect like "16:9,1" and spans like "1x1,2x2" (rows x columns)"""
+        if max_rows < 0 or max_columns < 0:
+            raise ValueError("max span rows and columns must be 0 or more")
+        ratios = []
+        for text in filter(None, (part.strip() for part in aspect.split(","))):
+            width, _, height = text.partition(":")
+            try:
+                ratio = float(width) / float(height or 1)
+            except (ValueError, ZeroDivisionError):
+                raise ValueError(f"invalid aspect ratio {text!r}") from None
+            if ratio <= 0:
+                raise ValueError(f"invalid aspect ratio {text!r}")
+            ratios.append(ratio)
+        sizes = set()
+        for text in filter(None, (part.strip() for part in spans.split(","))):
+            try:
+                num_row, num_col = (int(part) for part in text.lower().split("x"))
+            except ValueError:
+                raise ValueError(f"invalid span {text!r}, expected ROWSxCOLUMNS") from None
+            sizes.add((num_row, num_col))
+        return cls(max_rows, max_columns, tuple(ratios), bool(edge_only), frozenset(sizes))
+
+    @property
+    def pairwise(self) -> bool:
+        """True if spans are pruned on the combination of rows and columns"""
+        return bool(self.aspect_ratios or self.edge_only or self.sizes)
+
+    def axis_nums(self, cells: int, max_num: int, index: int) -> set[int]:
+        """The span sizes allowed along one axis, index 0 for rows and 1 for columns"""
+        nums = set(range(1, (min(cells, max_num) if max_num else cells) + 1))
+        if self.sizes:
+            nums &= {size[index] for size in self.sizes}
+        return nums
+
+    def allows(
+        self,
+        grid: "GridCalculator",
+        row: int,
+        num_row: int,
+        col: int,
+        num_col: int,
+    ) -> bool:
+        if self.sizes and (num_row, num_col) not in self.sizes:
+            return False
+        if self.edge_only and not (
+            row == 0
+            or col == 0
+            or row + num_row == grid.rows
+            or col + num_col == grid.columns
+        ):
+            return False
+        if self.aspect_ratios:
+            ratio = (num_col * grid.width * grid.rows) / (num_row * grid.height * grid.columns)
+            return any(
+                abs(ratio - allowed) <= allowed * self.tolerance
+                for allowed in self.aspect_ratios
+            )
+        return True
+
+
 @dataclass
 class GridCalculator:
     rows: int
@@ -113,36 +234,205 @@ class GridCalculator:
     height: int = 2160
     padding: int = 32
 
-    @cached_property
-    def block_width(self):
-        return round(self.width / self.columns)
+    def calc_block(self, start_row, start_col, num_row, num_col, border: bool = True):
+        """Position and size of a span, from the edges of the cells it covers"""
+        row_starts, row_ends = axis_lines(self.rows, self.height, self.padding, border)
+        col_starts, col_ends = axis_lines(self.columns, self.width, self.padding, border)
+        x = col_starts[start_col]
+        y = row_starts[start_row]
+        return x, y, col_ends[start_col + num_col] - x, row_ends[start_row + num_row] - y
+
+    def calc_axis(
+        self, cells: int, length: int, border: bool = True, nums: set[int] = None
+    ) -> "AxisSpans":
+        """Calculate position and size of every span along one axis of the grid
+
+        Only spans with a number of cells in nums are calculated, all if None.
+        """
+        starts, ends = axis_lines(cells, length, self.padding, border)
+        axis = AxisSpans(array("i"), array("i"), array("i"), array("i"))
+        for start in range(cells):
+            pos = starts[start]
+            for num in range(1, cells - start + 1):
+                if nums is not None and num not in nums:
+                    continue
+                axis.start.append(start)
+                axis.num.append(num)
+                axis.pos.append(pos)
+                axis.size.append(ends[start + num] - pos)
+        return axis
+
+    def calc_spans(
+        self,
+        border: bool = True,
+        constraints: SpanConstraints = None,
+        cells: range = None,
+    ) -> "GridSpans":
+        """Calculate all sub-rectangles of the grid in one pass
+
+        The spans are ordered by start row, start column, number of rows
+        and number of columns, the same order as nested loops over
+        calc_block would give.
+        Each axis is only calculated once, the rectangles are the cross
+        product of the row and column spans. Spans excluded by the
+        constraints are pruned while enumerating, on the axes where
+        possible, and never calculated.
+        With cells, only the spans starting in these cells (numbered
+        row * columns + col) are calculated, to split the grid in shards.
+        """
+        rows, cols = self.calc_axes(border, constraints)
+        spans = GridSpans(*(array("i") for _ in GridSpans.__dataclass_fields__))
+        if constraints is not None and constraints.pairwise:
+            self.add_constrained_spans(spans, rows, cols, constraints, cells)
+            return spans
+        for row, row_slice in rows.slices():
+            row_count = row_slice.stop - row_slice.start
+            for col, col_slice in cols.slices():
+                if cells is not None and row * self.columns + col not in cells:
+                    continue
+                col_count = col_slice.stop - col_slice.start
+                for ndx in range(row_slice.start, row_slice.stop):
+                    spans.num_row.extend(array("i", [rows.num[ndx]]) * col_count)
+                    spans.y.extend(array("i", [rows.pos[ndx]]) * col_count)
+                    spans.height.extend(array("i", [rows.size[ndx]]) * col_count)
+                total = row_count * col_count
+                spans.row.extend(array("i", [row]) * total)
+                spans.col.extend(array("i", [col]) * total)
+                spans.num_col.extend(cols.num[col_slice] * row_count)
+                spans.x.extend(cols.pos[col_slice] * row_count)
+                spans.width.extend(cols.size[col_slice] * row_count)
+        return spans
+
+    def calc_axes(
+        self, border: bool = True, constraints: SpanConstraints = None
+    ) -> tuple["AxisSpans", "AxisSpans"]:
+        """Calculate the row and column spans allowed by the constraints"""
+        if constraints is None:
+            return (
+                self.calc_axis(self.rows, self.height, border),
+                self.calc_axis(self.columns, self.width, border),
+            )
+        row_nums = constraints.axis_nums(self.rows, constraints.max_rows, 0)
+        col_nums = constraints.axis_nums(self.columns, constraints.max_columns, 1)
+        return (
+            self.calc_axis(self.rows, self.height, border, row_nums),
+            self.calc_axis(self.columns, self.width, border, col_nums),
+        )
+
+    def add_constrained_spans(
+        self,
+        spans: "GridSpans",
+        rows: "AxisSpans",
+        cols: "AxisSpans",
+        constraints: SpanConstraints,
+        cells: range = None,
+    ) -> None:
+        allows = constraints.allows
+        for row, row_slice in rows.slices():
+            for col, col_slice in cols.slices():
+                if cells is not None and row * self.columns + col not in cells:
+                    continue
+                for row_ndx in range(row_slice.start, row_slice.stop):
+                    num_row = rows.num[row_ndx]
+                    for col_ndx in range(col_slice.start, col_slice.stop):
+                        num_col = cols.num[col_ndx]
+                        if not allows(self, row, num_row, col, num_col):
+                            continue
+                        spans.row.append(row)
+                        spans.col.append(col)
+                        spans.num_row.append(num_row)
+                        spans.num_col.append(num_col)
+                        spans.x.append(cols.pos[col_ndx])
+                        spans.y.append(rows.pos[row_ndx])
+                        spans.width.append(cols.size[col_ndx])
+                        spans.height.append(rows.size[row_ndx])
+
+    def axis_counts(self, constraints: SpanConstraints = None) -> tuple[list[int], list[int]]:
+        """Number of row and column spans starting in every row and column"""
+        constraints = constraints or SpanConstraints()
+        row_nums = constraints.axis_nums(self.rows, constraints.max_rows, 0)
+        col_nums = constraints.axis_nums(self.columns, constraints.max_columns, 1)
+        return (
+            [sum(row + num <= self.rows for num in row_nums) for row in range(self.rows)],
+            [sum(col + num <= self.columns for num in col_nums) for col in range(self.columns)],
+        )
+
+    def count_spans(self, constraints: SpanConstraints = None, cells: range = None) -> int:
+        """Number of spans calc_spans returns, without calculating them"""
+        if cells is None:
+            cells = range(self.rows * self.columns)
+        if constraints is None or not constraints.pairwise:
+            row_counts, col_counts = self.axis_counts(constraints)
+            return sum(
+                row_counts[cell // self.columns] * col_counts[cell % self.columns]
+                for cell in cells
+            )
+        row_nums = constraints.axis_nums(self.rows, constraints.max_rows, 0)
+        col_nums = constraints.axis_nums(self.columns, constraints.max_columns, 1)
+        return sum(
+            constraints.allows(self, row, num_row, col, num_col)
+            for row, col in (divmod(cell, self.columns) for cell in cells)
+            for num_row in row_nums
+            if row + num_row <= self.rows
+            for num_col in col_nums
+            if col + num_col <= self.columns
+        )
 
-    @cached_property
-    def block_height(self):
-        return round(self.height / self.rows)
 
-    def calc_block(self, start_row, start_col, num_row, num_col, border: bool = True):
-        last_col = start_col + num_col
-        last_row = start_row + num_row
-        if border:
-            dt = self.padding / 2
-        else:
-            dt = 0
-        x = dt + (start_col * self.block_width)
-        y = dt + (start_row * self.block_height)
-        if last_col == self.columns:
-            width = num_col * self.block_width - (2 * dt)
-        else:
-            width = num_col * self.block_width - (dt)
-        if last_row == self.rows:
-            height = num_row * self.block_height - (2 * dt)
-        else:
-            height = num_row * self.block_height - (dt)
-        return round(x), round(y), round(width), round(height)
+@dataclass
+class AxisSpans:
+    """Spans along one grid axis, ordered by start cell and number of cells"""
+
+    start: array
+    num: array
+    pos: array
+    size: array
+
+    def slices(self) -> Iterator[tuple[int, slice]]:
+        """Yield the start cell and the slice of spans starting in it"""
+        begin = 0
+        while begin < len(self.start):
+            start = self.start[begin]
+            end = begin + 1
+            while end < len(self.start) and self.start[end] == start:
+                end += 1
+            yield start, slice(begin, end)
+            begin = end
 
 
 @dataclass
+class GridSpans:
+    """All sub-rectangles of a grid stored as struct of arrays"""
+
+    row: array
+    col: array
+    num_row: array
+    num_col: array
+    x: array
+    y: array
+    width: array
+    height: array
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    def __iter__(self) -> Iterator[tuple[int, ...]]:
+        return zip(
+            self.row,
+            self.col,
+            self.num_row,
+            self.num_col,
+            self.x,
+            self.y,
+            self.width,
+            self.height,
+        )
+
+
+@dataclass(frozen=True, slots=True)
 class VideoBlock:
+    """Immutable video block, the operations return a new block"""
+
     x: int
     y: int
     width: int
@@ -151,69 +441,157 @@ class VideoBlock:
     def split(self, rows: int, cols: int) -> Generator[Self, Any, None]:
         row_height = round(self.height / rows)
         col_width = round(self.width / cols)
-        start_x = self.x
-        start_y = self.y
         for row in range(rows):
             for col in range(cols):
                 start_x = self.x + col * col_width
                 start_y = self.y + row * row_height
                 yield VideoBlock(start_x, start_y, col_width, row_height)
 
-    def set_padding(self, padding: int):
-        self.x += padding
-        self.y += padding
-        self.width -= 2 * padding
-        self.height -= 2 * padding
-
-    def scale(self, factor: float, center: bool = False):
-        center_x = round(self.x + self.width / 2)
-        center_y = round(self.y + self.height / 2)
-        self.width = round(self.width * factor)
-        self.height = round(self.height * factor)
+    def set_padding(self, padding: int) -> Self:
+        return VideoBlock(
+            self.x + padding,
+            self.y + padding,
+            self.width - 2 * padding,
+            self.height - 2 * padding,
+        )
+
+    def scale(self, factor: float, center: bool = False) -> Self:
+        width = round(self.width * factor)
+        height = round(self.height * factor)
         if center:
-            self.x = center_x - self.width / 2
-            self.y = center_y - self.height / 2
+            center_x = round(self.x + self.width / 2)
+            center_y = round(self.y + self.height / 2)
+            return VideoBlock(center_x - width / 2, center_y - height / 2, width, height)
+        return VideoBlock(self.x, self.y, width, height)
 
-    def move_to_corner(self, frame: Self, corner: BlockType):
+    def move_to_corner(self, frame: Self, corner: BlockType) -> Self:
         match corner:
             case BlockType.TopLeft:
-                self.x = 0
-                self.y = 0
+                x, y = 0, 0
             case BlockType.TopRight:
-                self.x = frame.width - self.width
-                self.y = 0
+                x, y = frame.width - self.width, 0
             case BlockType.BottomLeft:
-                self.x = 0
-                self.y = frame.height - self.height
+                x, y = 0, frame.height - self.height
             case BlockType.BottomRight:
-                self.x = frame.width - self.width
-                self.y = frame.height - self.height
-
-    def __iadd__(self, other: Self) -> Self:
-        self.x += other.x
-        self.y += other.y
-        self.width += other.width
-        self.height += other.height
-        return self
+                x, y = frame.width - self.width, frame.height - self.height
+        return VideoBlock(x, y, self.width, self.height)
 
     def __add__(self, other: Self) -> Self:
-        self += other
-        return self
-
-    def __isub__(self, other: Self) -> Self:
-        self.x -= other.x
-        self.y -= other.y
-        self.width -= other.width
-        self.height -= other.height
-        return self
+        return VideoBlock(
+            self.x + other.x,
+            self.y + other.y,
+            self.width + other.width,
+            self.height + other.height,
+        )
 
     def __sub__(self, other: Self) -> Self:
-        self -= other
-        return self
+        return VideoBlock(
+            self.x - other.x,
+            self.y - other.y,
+            self.width - other.width,
+            self.height - other.height,
+        )
 
     def copy(self) -> Self:
         return VideoBlock(self.x, self.y, self.width, self.height)
 
 
+@dataclass(frozen=True)
+class VideoBlockArray:
+    """Video blocks stored as contiguous x, y, width and height arrays
+
+    The operations work on all blocks at once and return a new array.
+    """
+
+    x: array
+    y: array
+    width: array
+    height: array
+
+    @classmethod
+    def from_values(
+        cls,
+        x: Iterable[float],
+        y: Iterable[float],
+        width: Iterable[float],
+        height: Iterable[float],
+    ) -> Self:
+        return cls(array("d", x), array("d", y), array("d", width), array("d", height))
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[VideoBlock]) -> Self:
+        blocks = list(blocks)
+        return cls.from_values(
+            (block.x for block in blocks),
+            (block.y for block in blocks),
+            (block.width for block in blocks),
+            (block.height for block in blocks),
+        )
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __getitem__(self, index: int) -> VideoBlock:
+        return VideoBlock(self.x[index], self.y[index], self.width[index], self.height[index])
+
+    def __iter__(self) -> Iterator[VideoBlock]:
+        return map(VideoBlock, self.x, self.y, self.width, self.height)
+
+    def split(self, rows: int, cols: int) -> Self:
+        """Split every block in rows x cols tiles, like VideoBlock.split"""
+        row_heights = [round(height / rows) for height in self.height]
+        col_widths = [round(width / cols) for width in self.width]
+        tiles = rows * cols
+        x = [
+            start + col * col_width
+            for start, col_width in zip(self.x, col_widths)
+            for _ in range(rows)
+            for col in range(cols)
+        ]
+        y = [
+            start + row * row_height
+            for start, row_height in zip(self.y, row_heights)
+            for row in range(rows)
+            for _ in range(cols)
+        ]
+        width = [col_width for col_width in col_widths for _ in range(tiles)]
+        height = [row_height for row_height in row_heights for _ in range(tiles)]
+        return self.from_values(x, y, width, height)
+
+    def set_padding(self, padding: int) -> Self:
+        return self.from_values(
+            (x + padding for x in self.x),
+            (y + padding for y in self.y),
+            (width - 2 * padding for width in self.width),
+            (height - 2 * padding for height in self.height),
+        )
+
+    def scale(self, factor: float, center: bool = False) -> Self:
+        width = array("d", (round(width * factor) for width in self.width))
+        height = array("d", (round(height * factor) for height in self.height))
+        if not center:
+            return VideoBlockArray(array("d", self.x), array("d", self.y), width, height)
+        x = (
+            round(x + old / 2) - new / 2
+            for x, old, new in zip(self.x, self.width, width)
+        )
+        y = (
+            round(y + old / 2) - new / 2
+            for y, old, new in zip(self.y, self.height, height)
+        )
+        return VideoBlockArray(array("d", x), array("d", y), width, height)
+
+    def move_to_corner(self, frame: VideoBlock, corner: BlockType) -> Self:
+        if corner in (BlockType.TopRight, BlockType.BottomRight):
+            x = array("d", (frame.width - width for width in self.width))
+        else:
+            x = array("d", [0.0]) * len(self)
+        if corner in (BlockType.BottomLeft, BlockType.BottomRight):
+            y = array("d", (frame.height - height for height in self.height))
+        else:
+            y = array("d", [0.0]) * len(self)
+        return VideoBlockArray(x, y, array("d", self.width), array("d", self.height))
+
+
 def get_qhd_block() -> VideoBlock:
     return VideoBlock(0, 0, 3840, 1920)
@@ -0,0 +1,57 @@
+"""Integer fixed-point geometry shared by the block and grid calculators.
+
+Every coordinate is calculated as an exact fraction of integers and
+rounded once, half to even, so identical inputs give identical pixels on
+every platform. Sizes in percent are first converted to PERCENT_SCALE
+fixed-point, which only rounds sizes with more than 6 decimals.
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+
+# sizes in percent are fixed-point numbers with this many units per percent
+PERCENT_SCALE = 10**6
+
+
+def div_round(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half to even, like round() on the exact quotient"""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def to_fixed(value: float, scale: int = PERCENT_SCALE) -> int:
+    """Fixed-point value of a number, using its shortest decimal representation
+
+    Digits beyond 1 / scale are rounded half to even, a rounding step
+    before the geometry for values like 0.1 + 0.2 from a sweep.
+    """
+    return round(Decimal(repr(value)) * scale)
+
+
+def halves(value: float) -> int:
+    """Number of halves in a multiple of 0.5"""
+    count = value * 2
+    if count != int(count):
+        raise ValueError(f"{value} is not a multiple of 0.5")
+    return int(count)
+
+
+@lru_cache(maxsize=256)
+def axis_lines(
+    cells: int, length: int, padding: int, border: bool = True
+) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """Start and end positions of the spans along a grid axis
+
+    lines[0][start] is the position of a span starting in cell start and
+    lines[1][end] the end of a span ending before cell end. The cells are
+    length / cells wide, the edges are only rounded once, so the error
+    does not grow along the axis. The positions are cached per axis.
+    """
+    denominator = 2 * cells
+    dt = padding * cells if border else 0
+    starts = tuple(div_round(2 * cell * length + dt, denominator) for cell in range(cells))
+    ends = tuple(div_round(2 * cell * length, denominator) for cell in range(cells))
+    return starts, ends + (div_round(2 * cells * length - dt, denominator),)
@@ -0,0 +1,426 @@
+"""Headless command line interface for the preset generators.
+
+Generates the presets for all generators configured in presets.json, or
+a selected subset, without importing Qt.
+
+    python -m generator --output ~/Shotcut --only Pip --set size=40 --jobs 4
+    python -m generator --only SlideIn --sweep size=10:90:5 --sweep fps=24,25,30,60
+"""
+
+import argparse
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from generator.calc import PresetType
+from generator.preset import load_presets
+from generator.preset.diff import DiffSink
+from generator.preset.manifest import Manifest
+from generator.preset.report import GeneratorReport, RunReport, report_generator
+from generator.preset.sinks import archive_mode, open_sink, write_presets
+from generator.preset.sweep import parse_values, sweep
+from generator.preset.types import InputValue, PresetGenerator, PresetRecord
+from generator.preset.writer import LogMode, PresetWriteError, PresetWriter
+
+
+@dataclass
+class TaskResult:
+    name: str
+    preset_type: PresetType
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    manifest: dict[str, str] = field(default_factory=dict)
+    report: GeneratorReport = None
+
+
+@dataclass(frozen=True)
+class TaskOptions:
+    incremental: bool = True
+    # threads writing the files, 0 writes them synchronously
+    io_threads: int = 0
+    # collect a GeneratorReport for every task
+    report: bool = False
+    # path prefix for the cProfile files of the tasks
+    profile: str = None
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m generator", description="Generate presets for Shotcut"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="output directory or .zip/.tar archive (default: output in settings)",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="only run the generator with this name (can be repeated)",
+    )
+    parser.add_argument(
+        "-t",
+        "--type",
+        action="append",
+        choices=[str(preset_type) for preset_type in PresetType],
+        help="only generate this preset type (can be repeated)",
+    )
+    parser.add_argument(
+        "-s",
+        "--set",
+        action="append",
+        default=[],
+        metavar="[NAME.]PARAM=VALUE",
+        help="override a generator parameter (can be repeated)",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="[NAME.]PARAM=VALUES",
+        help="generate all values of a parameter, as list 24,25,30 or range 10:90:5",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=None,
+        help="threads writing the files per worker (default: io_threads in settings)",
+    )
+    parser.add_argument(
+        "--log",
+        choices=[str(mode) for mode in LogMode],
+        default=LogMode.SUMMARY,
+        help="logging of the written presets",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="write all presets, also the ones unchanged since the last run",
+    )
+    parser.add_argument(
+        "--report", metavar="PATH", help="save a JSON report of the stage times"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="capture a cProfile for every generator next to the report",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="only report the added, changed, unchanged and stale presets",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="list the generators and parameters"
+    )
+    return parser.parse_args(argv)
+
+
+def find_inputs(
+    presets: list[PresetGenerator], option: str
+) -> Iterator[tuple[PresetGenerator, InputValue, str]]:
+    """Yield the generator inputs matching a [NAME.]PARAM=VALUE option"""
+    key, sep, text = option.partition("=")
+    if not sep:
+        raise ValueError(f"invalid parameter option {option!r}")
+    name, _, param = key.rpartition(".")
+    found = False
+    for preset in presets:
+        if name and preset.name != name:
+            continue
+        for value in preset.inputs():
+            if value.name == param:
+                found = True
+                yield preset, value, text
+    if not found:
+        raise ValueError(f"no generator has a parameter {key!r}")
+
+
+def apply_overrides(presets: list[PresetGenerator], overrides: list[str]) -> None:
+    """Apply [NAME.]PARAM=VALUE overrides to the generator inputs"""
+    for override in overrides:
+        for _, value, text in find_inputs(presets, override):
+            value.value_from_string(text)
+
+
+def get_sweeps(
+    presets: list[PresetGenerator], sweeps: list[str]
+) -> dict[str, dict[str, list[Any]]]:
+    """Parse [NAME.]PARAM=VALUES sweep options per generator name"""
+    params: dict[str, dict[str, list[Any]]] = {}
+    for option in sweeps:
+        for preset, value, text in find_inputs(presets, option):
+            params.setdefault(preset.name, {})[value.name] = parse_values(value, text)
+    return params
+
+
+def select_presets(presets: list[PresetGenerator], only: list[str]) -> list[PresetGenerator]:
+    """Select the generators by name, without creating the others"""
+    selected = [preset for preset in presets if not only or preset.name in only]
+    if only and len(selected) != len(set(only)):
+        names = ", ".join(preset.name for preset in presets)
+        raise ValueError(f"unknown generator in {only}, available: {names}")
+    return selected
+
+
+def get_tasks(
+    presets: list[PresetGenerator], only: list[str], types: list[str]
+) -> list[tuple[PresetGenerator, PresetType]]:
+    selected = select_presets(presets, only)
+    return [
+        (preset, preset_type)
+        for preset in selected
+        for preset_type in preset.types()
+        if not types or preset_type in types
+    ]
+
+
+def get_records(
+    preset: PresetGenerator, params: dict[str, list[Any]] = None
+) -> Iterator[PresetRecord]:
+    if params:
+        return sweep(preset, params)
+    return preset.presets()
+
+
+def profile_path(options: TaskOptions, name: str, preset_type: PresetType) -> str:
+    if not options.profile:
+        return None
+    return f"{options.profile}_{name}_{preset_type}.prof"
+
+
+def run_task(
+    preset: PresetGenerator,
+    preset_type: PresetType,
+    options: TaskOptions = TaskOptions(),
+    params: dict[str, list[Any]] = None,
+) -> TaskResult:
+    """Generate the presets of one type, the manifest is saved by the caller"""
+    preset.active_type = preset_type
+    log = LogMode.VERBOSE if preset.log == LogMode.VERBOSE else LogMode.QUIET
+    report = GeneratorReport(preset.name, str(preset_type))
+    with ExitStack() as stack:
+        if options.report:
+            profile = profile_path(options, preset.name, preset_type)
+            stack.enter_context(report_generator(report, profile))
+        writer = PresetWriter(
+            preset.output,
+            log,
+            incremental=options.incremental,
+            save_manifest=False,
+            threads=options.io_threads,
+        )
+        with writer:
+            write_presets(get_records(preset, params), writer)
+    return TaskResult(
+        preset.name,
+        preset_type,
+        writer.files,
+        writer.bytes,
+        writer.skipped,
+        writer.manifest.updates,
+        report,
+    )
+
+
+def run_archive(
+    tasks: list[tuple[PresetGenerator, PresetType]],
+    output: str,
+    log: LogMode,
+    options: TaskOptions = TaskOptions(),
+    sweeps: dict[str, dict[str, list[Any]]] = None,
+) -> RunReport:
+    """Generate all presets sequentially into a single archive"""
+    sweeps = sweeps or {}
+    run_report = RunReport()
+    with open_sink(output, log) as sink:
+        for preset, preset_type in tasks:
+            preset.active_type = preset_type
+            records = get_records(preset, sweeps.get(preset.name))
+            if options.report:
+                profile = profile_path(options, preset.name, preset_type)
+                with run_report.generator(preset.name, preset_type, profile):
+                    write_presets(records, sink)
+            else:
+                write_presets(records, sink)
+    return run_report
+
+
+def run_diff(
+    tasks: list[tuple[PresetGenerator, PresetType]],
+    output: str,
+    sweeps: dict[str, dict[str, list[Any]]] = None,
+) -> DiffSink:
+    """Compare all presets with the output directory without writing"""
+    sweeps = sweeps or {}
+    with DiffSink(output) as diff:
+        for preset, preset_type in tasks:
+            preset.active_type = preset_type
+            write_presets(get_records(preset, sweeps.get(preset.name)), diff)
+    return diff
+
+
+def shard_tasks(
+    tasks: list[tuple[PresetGenerator, PresetType]],
+    workers: int,
+    options: TaskOptions = TaskOptions(),
+    sweeps: dict[str, dict[str, list[Any]]] = None,
+    stack: ExitStack = None,
+) -> list[tuple[PresetGenerator, PresetType]]:
+    """Split the tasks of generators supporting shards over the workers
+
+    Sweeps and profiles are run per generator and not split. With a
+    stack, the geometry is calculated once into shared memory, which is
+    released when the stack is closed.
+    """
+    sweeps = sweeps or {}
+    sharded = []
+    for preset, preset_type in tasks:
+        if options.profile or sweeps.get(preset.name) or not hasattr(preset, "shards"):
+            sharded.append((preset, preset_type))
+            continue
+        preset.active_type = preset_type
+        shared = stack.enter_context(preset.share_geometry()).handle if stack else None
+        sharded.extend((shard, preset_type) for shard in preset.shards(workers, shared))
+    return sharded
+
+
+def merge_results(results: list[TaskResult]) -> list[TaskResult]:
+    """Merge the results of the shards of a task, in task order"""
+    merged: dict[tuple[str, PresetType], TaskResult] = {}
+    for result in results:
+        key = (result.name, result.preset_type)
+        if key not in merged:
+            merged[key] = result
+            continue
+        task = merged[key]
+        task.files += result.files
+        task.bytes += result.bytes
+        task.skipped += result.skipped
+        task.manifest.update(result.manifest)
+        if task.report and result.report:
+            task.report.merge(result.report)
+    return list(merged.values())
+
+
+def run_tasks(
+    tasks: list[tuple[PresetGenerator, PresetType]],
+    output: str,
+    jobs: int = None,
+    options: TaskOptions = TaskOptions(),
+    sweeps: dict[str, dict[str, list[Any]]] = None,
+) -> list[TaskResult]:
+    """Generate all tasks in a process pool and save the merged manifest"""
+    sweeps = sweeps or {}
+    manifest = Manifest.load(output)
+    if jobs == 1:
+        results = [
+            run_task(preset, preset_type, options, sweeps.get(preset.name))
+            for preset, preset_type in tasks
+        ]
+    else:
+        stack = ExitStack()
+        tasks = shard_tasks(tasks, jobs or os.cpu_count() or 1, options, sweeps, stack)
+        with stack, ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(
+                    run_task,
+                    preset,
+                    preset_type,
+                    options,
+                    sweeps.get(preset.name),
+                )
+                for preset, preset_type in tasks
+            ]
+            results = merge_results([future.result() for future in futures])
+    for result in results:
+        manifest.merge(result.manifest)
+    manifest.save()
+    return results
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    presets, settings = load_presets()
+    if args.list:
+        for preset in presets:
+            params = ", ".join(f"{value.name}={value.value}" for value in preset.inputs())
+            types = ", ".join(preset.types())
+            print(f"{preset.name}: {preset.description} [{types}] {params}")
+        return 0
+    output = args.output or settings.output
+    try:
+        # only the selected generators are created
+        presets = select_presets(presets, args.only)
+        for preset in presets:
+            preset.inputs()
+        apply_overrides(presets, args.set)
+        sweeps = get_sweeps(presets, args.sweep)
+        tasks = get_tasks(presets, args.only, args.type)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    for preset in presets:
+        preset.output = output
+        preset.log = LogMode(args.log)
+    options = TaskOptions(
+        incremental=not args.full,
+        io_threads=settings.io_threads if args.io_threads is None else args.io_threads,
+        report=bool(args.report or args.profile),
+        profile=(
+            Path(args.report or "report").with_suffix("").as_posix()
+            if args.profile
+            else None
+        ),
+    )
+    try:
+        if args.dry_run:
+            if archive_mode(Path(output).name):
+                print("error: dry run needs an output directory", file=sys.stderr)
+                return 2
+            diff = run_diff(tasks, output, sweeps)
+            if args.log == LogMode.VERBOSE:
+                for category, names in diff.names.items():
+                    for name in names:
+                        print(f"{category:<10}{name}")
+            print(f"Dry run: {diff.summary()}")
+            return 0
+        if archive_mode(Path(output).name):
+            run_report = run_archive(tasks, output, LogMode(args.log), options, sweeps)
+        else:
+            try:
+                results = run_tasks(tasks, output, args.jobs, options, sweeps)
+            except PresetWriteError as e:
+                print(f"error: {e}", file=sys.stderr)
+                return 1
+            run_report = RunReport([result.report for result in results])
+            if args.log != LogMode.QUIET:
+                for result in results:
+                    print(
+                        f"{result.name} {result.preset_type}: {result.files} written "
+                        f"({result.bytes} bytes), {result.skipped} unchanged"
+                    )
+    except ValueError as e:
+        # e.g. sweep values giving presets with the same name
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.report:
+        run_report.save(args.report)
+    if options.report and args.log != LogMode.QUIET:
+        print(f"Run report: {run_report.summary()}")
+    return 0
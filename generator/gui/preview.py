@@ -0,0 +1,49 @@
+"""Draw the preset layout preview."""
+
+from collections import OrderedDict
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QColor, QPainter, QPen, QPixmap
+
+from generator.preset.preview import Layout
+
+BACKGROUND = QColor("#202020")
+OUTLINE = QColor("#4caf50")
+FILL = QColor(76, 175, 80, 60)
+
+
+def render_layout(layout: Layout, width: int, height: int) -> QPixmap:
+    """Draw the rectangles of a layout, scaled to fit in width x height"""
+    scale = min(width / layout.width, height / layout.height)
+    pixmap = QPixmap(max(round(layout.width * scale), 1), max(round(layout.height * scale), 1))
+    pixmap.fill(BACKGROUND)
+    painter = QPainter(pixmap)
+    painter.scale(scale, scale)
+    pen = QPen(OUTLINE)
+    pen.setCosmetic(True)
+    painter.setPen(pen)
+    painter.setBrush(FILL)
+    painter.drawRects([QRect(*rect) for rect in layout.rects])
+    painter.end()
+    return pixmap
+
+
+class PreviewCache:
+    """Rendered previews, cached by layout and size"""
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._pixmaps: OrderedDict[tuple, QPixmap] = OrderedDict()
+
+    def pixmap(self, layout: Layout, width: int, height: int) -> QPixmap:
+        key = (layout, width, height)
+        try:
+            self._pixmaps.move_to_end(key)
+            return self._pixmaps[key]
+        except KeyError:
+            pass
+        pixmap = render_layout(layout, width, height)
+        self._pixmaps[key] = pixmap
+        if len(self._pixmaps) > self.maxsize:
+            self._pixmaps.popitem(last=False)
+        return pixmap
@@ -0,0 +1,18 @@
+"""Timing of the GUI startup."""
+
+import time
+
+
+class StartupTimer:
+    """Record the time since the start of the application at named marks"""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        self.marks[name] = time.perf_counter() - self.start
+        return self.marks[name]
+
+    def report(self) -> str:
+        return ", ".join(f"{name}: {value * 1000:.1f}ms" for name, value in self.marks.items())
@@ -0,0 +1,52 @@
+"""Load Qt Designer files through a cache of compiled Python modules."""
+
+import io
+
+from pathlib import Path
+
+from PyQt6 import uic
+from PyQt6.QtCore import PYQT_VERSION_STR
+from PyQt6.QtWidgets import QWidget
+
+from generator import CACHE_DIR
+
+
+def compiled_ui(ui_file: Path, cache_dir: Path = CACHE_DIR / Path("ui")) -> str:
+    """Return the Python code for a .ui file, compile it if the cache is stale
+
+    The cache is keyed on the PyQt6 version, the code generated by uic
+    may not work with another version.
+    """
+    stat = ui_file.stat()
+    key = f"{PYQT_VERSION_STR}_{stat.st_mtime_ns}_{stat.st_size}"
+    cache_file = cache_dir / Path(f"{ui_file.stem}_{key}.py")
+    try:
+        return cache_file.read_text()
+    except OSError:
+        pass
+    code = io.StringIO()
+    uic.compileUi(ui_file.as_posix(), code)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for old_file in cache_dir.glob(f"{ui_file.stem}_*.py"):
+            old_file.unlink()
+        cache_file.write_text(code.getvalue())
+    except OSError as e:
+        print(f"Could not cache compiled ui file : {e}")
+    return code.getvalue()
+
+
+def load_ui(ui_file: Path, widget: QWidget) -> None:
+    """Setup the widget from a .ui file, like uic.loadUi without parsing the XML"""
+    namespace = {}
+    exec(compiled_ui(ui_file), namespace)
+    ui_class = next(
+        value
+        for name, value in namespace.items()
+        if name.startswith("Ui_") and isinstance(value, type)
+    )
+    ui = ui_class()
+    ui.setupUi(widget)
+    # uic.loadUi sets the child widgets as attributes of the widget
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)
@@ -1,30 +1,39 @@
 import platform
-import os
 
 from pathlib import Path
-from PyQt6.QtWidgets import QWidget, QLabel, QLineEdit, QVBoxLayout
-from PyQt6 import uic
-from PyQt6.QtMultimediaWidgets import QVideoWidget
-from PyQt6.QtMultimedia import QMediaPlayer
-from PyQt6.QtCore import QUrl, pyqtSlot
+from PyQt6.QtWidgets import QWidget, QLabel, QLineEdit, QSizePolicy, QVBoxLayout
+from PyQt6.QtCore import Qt
 
 from generator import DATA_DIR
 from generator.calc import PRESET_NAMES
+from generator.gui.preview import PreviewCache
+from generator.gui.startup import StartupTimer
+from generator.gui.ui import load_ui
+from generator.gui.worker import GenerateWorker
 from generator.preset import PresetGenerator
+from generator.preset.report import RunReport
 from generator.preset.types import InputValue
-from generator.preset.utils import get_output_path
+from generator.preset.utils import get_appdata_dir
 
 
 class MainWindow(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, startup: StartupTimer = None) -> None:
         super().__init__()
         ui_file = DATA_DIR / Path("ui/main.ui")
-        uic.loadUi(ui_file, self)
+        load_ui(ui_file, self)
         self.presets: list[PresetGenerator] = None
         self.ui: list = None
         self.settings = None
-        self.media_player: QMediaPlayer = None
-        self.video_widget: QVideoWidget = None
+        self.startup = startup
+        self.worker: GenerateWorker = None
+        self.previews = PreviewCache()
+        self.lbl_preview = QLabel()
+        self.lbl_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_preview.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        box = QVBoxLayout()
+        box.setContentsMargins(0, 0, 0, 0)
+        box.addWidget(self.lbl_preview)
+        self.preview.setLayout(box)
         self.setGeometry(0, 0, 600, 800)
         self.set_message("Select generator, filter and press Generate")
 
@@ -32,51 +41,60 @@ class MainWindow(QWidget):
         self.settings = settings
         self.get_output_path()
 
-    def setup_video(self):
-        box = QVBoxLayout()
-        self.media_player = QMediaPlayer()
-        self.media_player.errorOccurred.connect(self.on_player_error)
-        self.video_widget = QVideoWidget()
-        self.media_player.setVideoOutput(self.video_widget)
-        box.addWidget(self.video_widget)
-        self.preview.setLayout(box)
-
-    def play_video(self, preset: str):
-        video = DATA_DIR / Path(f"media/{preset}.webm")
-        if video.exists():
-            if not self.media_player:
-                self.setup_video()
-            self.media_player.setSource(QUrl.fromLocalFile(video.as_posix()))
-            self.media_player.setPosition(0)
-            self.media_player.play()
+    def current_preset(self) -> PresetGenerator:
+        preset = self.presets[self.cb_presets.currentIndex()]
+        types = preset.types()
+        index = self.cb_preset_type.currentIndex()
+        if 0 <= index < len(types):
+            preset.active_type = types[index]
+        return preset
+
+    def update_preview(self):
+        """Draw the layout of the current inputs, skip while an input is invalid"""
+        # the inputs of a running generator are not changed
+        if not self.presets or self.worker or not self.preview.isVisible():
+            return
+        preset = self.current_preset()
+        try:
+            for edit, value in zip(self.ui, preset.inputs()):
+                value.value_from_string(edit.text())
+            layout = preset.layout()
+        except (ValueError, ZeroDivisionError):
+            return
+        pixmap = self.previews.pixmap(layout, self.preview.width(), self.preview.height())
+        self.lbl_preview.setPixmap(pixmap)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_preview()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_preview()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.startup:
+            self.startup.mark("first paint")
+            print(f"Startup time : {self.startup.report()}")
+            self.startup = None
 
     def add_presets(self, presets: list[PresetGenerator]):
         self.presets = presets
         for preset in self.presets:
             self.cb_presets.addItem(preset.description)
         self.cb_presets.activated.connect(self.on_preset_activated)
+        self.cb_preset_type.activated.connect(self.update_preview)
         self.btn_generate.clicked.connect(self.on_generate_clicked)
+        self.btn_cancel.clicked.connect(self.on_cancel_clicked)
         self.le_output.textEdited.connect(self.on_output_edited)
         self.setup_parameters(self.presets[0])
 
     def get_output_path(self):
         print(f"platform: {platform.system()}")
-        match platform.system().lower():
-            case "linux":
-                if path := get_output_path(self.settings.LIXUX_PATHS):
-                    self.settings = self.settings._replace(output=path)
-            case "windows":
-                localappdata = os.getenv("LOCALAPPDATA")
-                path = Path(localappdata) / Path("Meltytech") / Path("Shotcut")
-                if path.exists():
-                    self.settings = self.settings._replace(output=str(path))
-            case "darwin":
-                path = Path(
-                    "~/Library/Application Support/Meltytech/Shotcut/"
-                ).expanduser()
-                if path.exists():
-                    self.settings = self.settings._replace(output=str(path))
-        print("Data directory: {self.settings.output}")
+        if path := get_appdata_dir(platform.system().lower(), self.settings.LIXUX_PATHS):
+            self.settings = self.settings._replace(output=path)
+        print(f"Data directory: {self.settings.output}")
 
         self.le_output.setText(self.settings.output)
 
@@ -96,18 +114,15 @@ class MainWindow(QWidget):
             label = QLabel(value.label)
             edit = QLineEdit()
             self.ui.append(edit)
-            if value.value:
+            if value.value is not None:
                 edit.setText(str(value.value))
+            edit.textEdited.connect(self.update_preview)
             fbox.addRow(label, edit)
-        self.play_video(preset.name.lower())
+        self.update_preview()
 
     def set_message(self, message: str):
         self.lbl_message.setText(message)
 
-    @pyqtSlot("QMediaPlayer::Error", str)
-    def on_player_error(self, error, error_string):
-        print(f"Video player error : {error_string}")
-
     def on_output_edited(self, txt):
         self.settings = self.settings._replace(output=txt)
         print(self.settings.output)
@@ -120,15 +135,60 @@ class MainWindow(QWidget):
         self.set_message("")
 
     def on_generate_clicked(self):
-        index = self.cb_presets.currentIndex()
-        preset = self.presets[index]
-        index = self.cb_preset_type.currentIndex()
-        preset.active_type = preset.types()[index]
+        if self.worker:
+            return
+        preset = self.current_preset()
         preset.output = self.settings.output
         print(f"Generating : {preset.name}")
         needed_values: list[InputValue] = preset.inputs()
         for i, value in enumerate(needed_values):
             text = self.ui[i].text()
-            value.value_from_string(text)
-        preset.generate()
+            try:
+                value.value_from_string(text)
+            except ValueError as e:
+                # an exception leaving a slot aborts the application
+                self.set_message(f"{value.label} : invalid value {text!r} ({e})")
+                return
+        self.worker = GenerateWorker(preset, self.settings.report, self.settings.profile)
+        self.worker.progress.connect(self.on_generate_progress)
+        self.worker.generated.connect(self.on_generate_done)
+        self.worker.failed.connect(self.on_generate_failed)
+        self.worker.cancelled.connect(self.on_generate_cancelled)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.btn_generate.setEnabled(False)
+        self.btn_cancel.setEnabled(True)
+        self.worker.start()
+
+    def on_cancel_clicked(self):
+        if self.worker:
+            self.btn_cancel.setEnabled(False)
+            self.worker.cancel()
+
+    def on_generate_progress(self, done: int, total: int, size: int):
+        self.pb_progress.setMaximum(max(total, 1))
+        self.pb_progress.setValue(min(done, total))
+        self.set_message(f"{done} / {total} presets ({size} bytes)")
+
+    def on_generate_done(self, run_report: RunReport):
+        preset = self.worker.preset
+        print(f"Run report: {run_report.summary()}")
         self.set_message(f"{preset.description} presets was generated")
+
+    def on_generate_failed(self, error: str):
+        self.set_message(f"{self.worker.preset.description} : {error}")
+
+    def on_generate_cancelled(self, done: int):
+        self.set_message(f"{self.worker.preset.description} cancelled after {done} presets")
+
+    def on_worker_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.btn_generate.setEnabled(True)
+        self.btn_cancel.setEnabled(False)
+        self.update_preview()
+
+    def closeEvent(self, event):
+        if self.worker:
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
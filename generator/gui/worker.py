@@ -0,0 +1,96 @@
+"""Run a preset generator outside of the Qt UI thread."""
+
+import threading
+
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from generator.preset import PresetGenerator
+from generator.preset.report import RunReport
+from generator.preset.shards import generate_shards
+from generator.preset.sinks import GenerationCancelled, ProgressSink, archive_mode, open_sink
+
+
+class GenerateWorker(QThread):
+    """Generate the presets of the active type in a worker thread
+
+    progress is emitted with the presets written, the total and the bytes
+    written, the window stays responsive and can cancel the run.
+    """
+
+    progress = pyqtSignal(int, int, int)
+    generated = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal(int)
+
+    def __init__(self, preset: PresetGenerator, report: str = "", profile: bool = False) -> None:
+        super().__init__()
+        self.preset = preset
+        self.report = report
+        self.profile = profile
+        self.cancel_event = threading.Event()
+        self.done = 0
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def sharded(self) -> bool:
+        """True if the preset is generated in shards by worker processes"""
+        workers = getattr(self.preset, "workers", 0)
+        return workers > 1 and hasattr(self.preset, "shards") and not archive_mode(
+            Path(self.preset.output).name
+        )
+
+    def generate_shards(self, total: int) -> None:
+        def progress(done: int, size: int) -> None:
+            self.done = done
+            self.progress.emit(done, total, size)
+
+        preset = self.preset
+        with preset.share_geometry() as block:
+            generate_shards(
+                preset.shards(preset.workers, block.handle),
+                preset.output,
+                preset.workers,
+                preset.io_threads,
+                preset.log,
+                progress,
+                self.cancel_event,
+            )
+
+    def run(self) -> None:
+        # an exception leaving QThread.run aborts the application
+        try:
+            self.generate()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def generate(self) -> None:
+        preset = self.preset
+        total = preset.count()
+        self.progress.emit(0, total, 0)
+        run_report = RunReport()
+        profile = None
+        if self.report and self.profile:
+            profile = Path(self.report).expanduser().with_suffix(".prof")
+        sink = None
+        try:
+            with run_report.generator(preset.name, preset.active_type, profile):
+                if self.sharded():
+                    self.generate_shards(total)
+                else:
+                    with open_sink(preset.output, preset.log, preset.io_threads) as output:
+                        sink = ProgressSink(
+                            output,
+                            lambda done, size: self.progress.emit(done, total, size),
+                            self.cancel_event,
+                        )
+                        preset.generate(sink)
+                    self.progress.emit(sink.presets, total, sink.bytes)
+        except GenerationCancelled:
+            self.cancelled.emit(sink.presets if sink else self.done)
+            return
+        if self.report:
+            run_report.save(self.report)
+        self.generated.emit(run_report)
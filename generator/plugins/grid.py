@@ -1,14 +1,21 @@
 """ test preset generator """
 from collections import namedtuple
-from pathlib import Path
-import urllib
 
-from dataclasses import dataclass
-from string import Template
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterator
 from generator.preset import factory
-from generator.preset.utils import get_dict_values, to_percent
-from generator.preset.types import InputValue
-from generator.calc import GridCalculator, PresetType
+from generator.preset.utils import get_input_values, to_percents
+from generator.preset.preview import Layout, grid_layout
+from generator.preset.profiles import Profile, parse_profiles, profile_name
+from generator.preset.render import compile_presets
+from generator.preset.report import stage
+from generator.preset.shared import SharedSpans, SpanBlock
+from generator.preset.shards import generate_shards, split_weighted
+from generator.preset.sinks import archive_mode, open_sink, write_presets
+from generator.preset.types import InputValue, PresetRecord, PresetSink
+from generator.preset.writer import LogMode
+from generator.calc import AxisSpans, GridCalculator, GridSpans, PresetType, SpanConstraints
 
 PRESETS = {
     PresetType.CROP_RECTANGLE: """---
@@ -18,72 +25,230 @@ color: "#00000000"
 ..."""
 }
 
+RENDERERS = compile_presets(PRESETS)
+
+# number of presets rendered in one batch
+CHUNK_SIZE = 4096
+
+# shards per worker, smaller shards balance the load between the workers
+SHARDS_PER_WORKER = 4
+
 
 @dataclass
 class GridPreset:
     name: str
+    width: int = 3840
+    height: int = 2160
     values: list[InputValue] = None
     output: str = "./shotcut"
+    log: LogMode = LogMode.VERBOSE
+    io_threads: int = 0
+    max_rows: int = 0
+    max_columns: int = 0
+    aspect: str = ""
+    edge_only: int = 0
+    spans: str = ""
+    # comma separated profile names, every profile is emitted as own preset set
+    profiles: str = ""
+    # worker processes, 0 or 1 generates in this process
+    workers: int = 0
+    # start cells per shard, 0 splits the grid in shards of equal size
+    shard_size: int = 0
+    # only generate the spans starting in these cells (row * columns + col)
+    cells: range = None
+    # spans calculated once in shared memory for the shards
+    shared: SharedSpans = None
     grid_calc: GridCalculator = None
+    constraints: SpanConstraints = None
+    profile_list: list[Profile] = None
+    # shown in the GUI, set from presets.json
+    description: str = ""
     active_type: PresetType = PresetType.CROP_RECTANGLE
 
     def setup(self, settings: namedtuple) -> None:
         self.output = settings.output
+        self.io_threads = settings.io_threads
+
+    def presets(self) -> Iterator[PresetRecord]:
+        self.setup_calc()
+        return self.generate_preset()
+
+    def setup_calc(self) -> None:
+        values = get_input_values(self.inputs())
+        self.grid_calc = GridCalculator(
+            values.rows, values.columns, width=self.width, height=self.height
+        )
+        self.constraints = SpanConstraints.parse(
+            values.max_rows, values.max_columns, values.aspect, values.edge_only, values.spans
+        )
+        self.profile_list = parse_profiles(values.profiles)
+
+    def generate(self, sink: PresetSink = None) -> None:
+        if sink:
+            write_presets(self.presets(), sink)
+        elif self.workers > 1 and not archive_mode(Path(self.output).name):
+            with self.share_geometry() as block:
+                generate_shards(
+                    self.shards(self.workers, block.handle),
+                    self.output,
+                    self.workers,
+                    self.io_threads,
+                    self.log,
+                )
+        else:
+            with open_sink(self.output, self.log, self.io_threads) as sink:
+                write_presets(self.presets(), sink)
+
+    def share_geometry(self) -> SpanBlock:
+        """Calculate the spans once into shared memory, read by all shards"""
+        self.setup_calc()
+        with stage("geometry"):
+            return SpanBlock(self.grid_calc.calc_spans(constraints=self.constraints))
+
+    def shards(self, workers: int, shared: SharedSpans = None) -> list["GridPreset"]:
+        """Split the start cells of the grid, return a generator for every shard
 
-    def generate(self) -> None:
-        values = get_dict_values(self.values)
-        self.grid_calc = GridCalculator(**values)
-        self.generate_preset()
+        With shared, the shards read their spans from the shared memory
+        instead of calculating them.
+        """
+        self.setup_calc()
+        total = self.grid_calc.rows * self.grid_calc.columns
+        if self.shard_size > 0:
+            cells = [
+                range(start, min(start + self.shard_size, total))
+                for start in range(0, total, self.shard_size)
+            ]
+        else:
+            row_counts, col_counts = self.grid_calc.axis_counts(self.constraints)
+            weights = [rows * cols for rows in row_counts for cols in col_counts]
+            cells = split_weighted(weights, workers * SHARDS_PER_WORKER)
+        return [replace(self, cells=shard, workers=0, shared=shared) for shard in cells]
 
     def inputs(self) -> list[InputValue]:
         if not self.values:
             self.values = [
                 InputValue("rows", "Rows", int, 3),
                 InputValue("columns", "Columns", int, 3),
+                InputValue("max_rows", "Max span rows (0 = all)", int, self.max_rows),
+                InputValue("max_columns", "Max span columns (0 = all)", int, self.max_columns),
+                InputValue("aspect", "Aspect ratios (16:9,1:1)", str, self.aspect),
+                InputValue("edge_only", "Edge spans only (0/1)", int, self.edge_only),
+                InputValue("spans", "Span sizes (1x1,2x2)", str, self.spans),
+                InputValue("profiles", "Profiles (1080p,4K,8K,Vertical)", str, self.profiles),
             ]
         return self.values
 
     def types(self) -> list(PresetType):
         return [PresetType.CROP_RECTANGLE]
 
-    @property
-    def description(self) -> str:
-        return "Grid Presets"
+    def count(self) -> int:
+        """Number of presets generated for the active type"""
+        self.setup_calc()
+        count = self.grid_calc.count_spans(self.constraints, self.cells)
+        return count * max(len(self.profile_list), 1)
+
+    def layout(self) -> Layout:
+        """Rectangles of the presets for the current inputs"""
+        values = get_input_values(self.inputs())
+        return grid_layout(values.rows, values.columns, self.width, self.height)
+
+    def make_crop_presets(
+        self, spans: GridSpans, chunk: slice, buffer: list[str]
+    ) -> Iterator[PresetRecord]:
+        grid = self.grid_calc
+        renderer = RENDERERS[self.active_type]
+        columns = {
+            "x": to_percents(spans.x[chunk], grid.width),
+            "y": to_percents(spans.y[chunk], grid.height),
+            "width": to_percents(spans.width[chunk], grid.width),
+            "height": to_percents(spans.height[chunk], grid.height),
+        }
+        renderer.render_rows(zip(*[columns[name] for name in renderer.fields]), buffer)
+        for row, col, num_row, num_col, tpl in zip(
+            spans.row[chunk],
+            spans.col[chunk],
+            spans.num_row[chunk],
+            spans.num_col[chunk],
+            buffer,
+        ):
+            name = f"Grid_{grid.columns}x{grid.rows}_({row+1},{col+1}.{num_row}x{num_col})"  # noqa
+            yield PresetRecord(self.active_type, name, tpl)
+
+    def generate_preset(self) -> Iterator[PresetRecord]:
+        if self.shared:
+            yield from self.generate_shared_preset()
+            return
+        with stage("geometry"):
+            spans = self.grid_calc.calc_spans(constraints=self.constraints, cells=self.cells)
+        yield from self.generate_chunks(spans)
+
+    def generate_shared_preset(self) -> Iterator[PresetRecord]:
+        cells = self.cells or range(self.grid_calc.rows * self.grid_calc.columns)
+        with self.shared.attach() as attached:
+            yield from self.generate_chunks(attached.cells(cells, self.grid_calc.columns))
 
-    def make_crop_preset(self, row, col, num_col, num_row):
-        x, y, w, h = self.grid_calc.calc_block(row, col, num_row, num_col)
+    def generate_chunks(self, spans: GridSpans) -> Iterator[PresetRecord]:
+        buffer: list[str] = []
+        if self.profile_list:
+            with stage("geometry"):
+                axes = [(profile, self.profile_axes(profile)) for profile in self.profile_list]
+            for start in range(0, len(spans), CHUNK_SIZE):
+                chunk = slice(start, start + CHUNK_SIZE)
+                yield from self.make_profile_presets(spans, chunk, axes, buffer)
+            return
+        for start in range(0, len(spans), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            yield from self.make_crop_presets(spans, chunk, buffer)
+
+    def profile_axes(self, profile: Profile) -> tuple[dict, dict]:
+        """Percentages of the row and column spans in the frame of a profile
+
+        Only the spans of the axes depend on the resolution, every span of
+        the grid is a pair of a row and a column span.
+        """
+        grid = self.grid_calc
+        calc = GridCalculator(grid.rows, grid.columns, profile.width, profile.height, grid.padding)
+        rows, cols = calc.calc_axes(constraints=self.constraints)
+        return (axis_percents(rows, profile.height), axis_percents(cols, profile.width))
+
+    def make_profile_presets(
+        self,
+        spans: GridSpans,
+        chunk: slice,
+        axes: list[tuple[Profile, tuple[dict, dict]]],
+        buffer: list[str],
+    ) -> Iterator[PresetRecord]:
         grid = self.grid_calc
-        name = f"Grid_{grid.columns}x{grid.rows}_({row+1},{col+1}.{num_row}x{num_col})"  # noqa
-        template = Template(PRESETS[self.active_type])
-        tpl = template.substitute(
-            x=to_percent(x, 3840),
-            y=to_percent(y, 2160),
-            height=to_percent(h, 2160),
-            width=to_percent(w, 3840),
+        renderer = RENDERERS[self.active_type]
+        keys = list(
+            zip(spans.row[chunk], spans.num_row[chunk], spans.col[chunk], spans.num_col[chunk])
         )
-        self.write_preset(name, tpl)
+        names = [
+            f"Grid_{grid.columns}x{grid.rows}_({row+1},{col+1}.{num_row}x{num_col})"  # noqa
+            for row, num_row, col, num_col in keys
+        ]
+        for profile, (row_percents, col_percents) in axes:
+            columns = {"x": [], "y": [], "width": [], "height": []}
+            for row, num_row, col, num_col in keys:
+                y, height = row_percents[row, num_row]
+                x, width = col_percents[col, num_col]
+                columns["x"].append(x)
+                columns["y"].append(y)
+                columns["width"].append(width)
+                columns["height"].append(height)
+            renderer.render_rows(zip(*[columns[name] for name in renderer.fields]), buffer)
+            for name, tpl in zip(names, buffer):
+                yield PresetRecord(self.active_type, profile_name(profile, name), tpl)
+
 
-    def write_preset(self, name: str, preset: str):
-        qf_name = urllib.parse.quote_plus(name)
-        directory = (
-            Path(self.output).expanduser() / Path("presets") / Path(self.active_type)
+def axis_percents(axis: AxisSpans, size: int) -> dict[tuple[int, int], tuple[str, str]]:
+    """Position and size percentages of the axis spans, keyed on start and number of cells"""
+    return dict(
+        zip(
+            zip(axis.start, axis.num),
+            zip(to_percents(axis.pos, size), to_percents(axis.size, size)),
         )
-        if not directory.exists():
-            directory.mkdir(parents=True, exist_ok=True)
-        path = directory / Path(qf_name)
-        print(f"create preset {name} : {path.resolve().name}")
-        with open(path.resolve(), "w") as out_file:
-            out_file.write(preset)
-
-    def generate_preset(self):
-        grid = self.grid_calc
-        for row in range(grid.rows):
-            for col in range(grid.columns):
-                for row_ndx in range(grid.rows - row):
-                    for col_ndx in range(grid.columns - col):
-                        num_col = col_ndx + 1
-                        num_row = row_ndx + 1
-                        self.make_crop_preset(row, col, num_col, num_row)
+    )
 
 
 def register() -> None:
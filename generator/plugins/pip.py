@@ -1,21 +1,21 @@
 """ slidein preset generator """
 
-from string import Template
-import urllib
-
 from collections import namedtuple
 from dataclasses import dataclass
-from pathlib import Path
+from typing import Iterator
 from generator.calc import (
-    CROP_BLOCKS,
-    MASK_BLOCKS,
-    SPR_BLOCKS,
-    BlockCalc,
+    corner_blocks,
     PresetType,
 )
 from generator.preset import factory
-from generator.preset.utils import get_input_values, to_percent
-from generator.preset.types import InputValue
+from generator.preset.utils import format_size, get_input_values, to_percent
+from generator.preset.preview import Layout, corner_layout
+from generator.preset.profiles import Profile, frame_profiles, parse_profiles, profile_name
+from generator.preset.render import compile_presets
+from generator.preset.report import stage
+from generator.preset.sinks import open_sink, write_presets
+from generator.preset.types import InputValue, PresetRecord, PresetSink
+from generator.preset.writer import LogMode
 
 PRESETS = {
     PresetType.SIZE_POSITION_ROTATE: """---
@@ -45,6 +45,8 @@ color: "#00000000"
 ...""",
 }
 
+RENDERERS = compile_presets(PRESETS)
+
 
 @dataclass
 class PipPreset:
@@ -55,26 +57,43 @@ class PipPreset:
     padding: round
     values: list[InputValue] = None
     output: str = "./shotcut"
+    log: LogMode = LogMode.VERBOSE
+    io_threads: int = 0
+    # comma separated profile names, every profile is emitted as own preset set
+    profiles: str = ""
+    profile_list: list[Profile] = None
+    # shown in the GUI, set from presets.json
+    description: str = ""
     active_type: PresetType = PresetType.SIZE_POSITION_ROTATE
 
     def setup(self, settings: namedtuple) -> None:
         self.output = settings.output
+        self.io_threads = settings.io_threads
 
-    def generate(self) -> None:
+    def presets(self) -> Iterator[PresetRecord]:
         values: namedtuple = get_input_values(self.values)
         self.size = values.size
+        self.profile_list = parse_profiles(values.profiles)
         match (self.active_type):
             case PresetType.CROP_RECTANGLE:
-                self.calc_crop_preset()
+                yield from self.calc_crop_preset()
             case PresetType.SIZE_POSITION_ROTATE:
-                self.calc_spr_preset()
+                yield from self.calc_spr_preset()
             case PresetType.MASK_SIMPLE:
-                self.calc_mask_preset()
+                yield from self.calc_mask_preset()
+
+    def generate(self, sink: PresetSink = None) -> None:
+        if sink:
+            write_presets(self.presets(), sink)
+        else:
+            with open_sink(self.output, self.log, self.io_threads) as sink:
+                write_presets(self.presets(), sink)
 
     def inputs(self) -> list[InputValue]:
         if not self.values:
             self.values = [
                 InputValue("size", "Size(%)", float, self.size),
+                InputValue("profiles", "Profiles (1080p,4K,8K,Vertical)", str, self.profiles),
             ]
         return self.values
 
@@ -85,70 +104,48 @@ class PipPreset:
             PresetType.CROP_RECTANGLE,
         ]
 
-    @property
-    def description(self) -> str:
-        return "Picture in Picture"
+    def count(self) -> int:
+        """Number of presets generated for the active type"""
+        values: namedtuple = get_input_values(self.inputs())
+        return len(corner_blocks(values.size, "mask")) * max(len(parse_profiles(values.profiles)), 1)
+
+    def layout(self) -> Layout:
+        """Rectangles of the presets for the current inputs"""
+        values: namedtuple = get_input_values(self.inputs())
+        kind = "crop" if self.active_type == PresetType.CROP_RECTANGLE else "mask"
+        return corner_layout(values.size, kind, self.width, self.height)
 
     @property
     def filename(self):
         if self.active_type in [PresetType.MASK_SIMPLE, PresetType.CROP_RECTANGLE]:
-            return f"{self.size:.0f}%_Border"  # noqa
+            return f"{format_size(self.size)}%_Border"  # noqa
         else:
-            return f"{self.size:.0f}%"  # noqa
-
-    def calc_crop_preset(self):
-        calculator = BlockCalc(size=self.size)
-        for corner in CROP_BLOCKS.keys():
-            prefix = f"Pip_{corner.name}"
-            template = Template(PRESETS[self.active_type])
-            x, y, w, h = calculator.calc_crop(corner)
-            tpl = template.substitute(
-                x=to_percent(x, self.width),
-                y=to_percent(y, self.height),
-                height=to_percent(h, self.height),
-                width=to_percent(w, self.width),
-            )
-            self.write_preset(f"{prefix}_{self.filename}", tpl)
-
-    def calc_mask_preset(self):
-        calculator = BlockCalc(size=self.size)
-        for corner in MASK_BLOCKS.keys():
-            prefix = f"Pip_{corner.name}"
-            template = Template(PRESETS[self.active_type])
-            x, y, w, h = calculator.calc_mask(corner)
-            tpl = template.substitute(
-                x=to_percent(x, self.width),
-                y=to_percent(y, self.height),
-                height=to_percent(h, self.height),
-                width=to_percent(w, self.width),
-            )
-            self.write_preset(f"{prefix}_{self.filename}", tpl)
-
-    def calc_spr_preset(self):
-        calculator = BlockCalc(size=self.size)
-        for corner in SPR_BLOCKS.keys():
-            prefix = f"Pip_{corner.name}"
-            template = Template(PRESETS[self.active_type])
-            x, y, w, h = calculator.calc_mask(corner)
-            tpl = template.substitute(
-                x=to_percent(x, self.width),
-                y=to_percent(y, self.height),
-                height=to_percent(h, self.height),
-                width=to_percent(w, self.width),
-            )
-            self.write_preset(f"{prefix}_{self.filename}", tpl)
-
-    def write_preset(self, name: str, preset: str):
-        qf_name = urllib.parse.quote_plus(name)
-        directory = (
-            Path(self.output).expanduser() / Path("presets") / Path(self.active_type)
-        )
-        if not directory.exists():
-            directory.mkdir(parents=True, exist_ok=True)
-        path = directory / Path(qf_name)
-        print(f"create preset {name} : {path.resolve().name} in {directory}")
-        with open(path.resolve(), "w") as out_file:
-            out_file.write(preset)
+            return f"{format_size(self.size)}%"  # noqa
+
+    def calc_crop_preset(self) -> Iterator[PresetRecord]:
+        yield from self.calc_corner_presets("crop")
+
+    def calc_mask_preset(self) -> Iterator[PresetRecord]:
+        yield from self.calc_corner_presets("mask")
+
+    def calc_spr_preset(self) -> Iterator[PresetRecord]:
+        yield from self.calc_corner_presets("mask")
+
+    def calc_corner_presets(self, kind: str) -> Iterator[PresetRecord]:
+        renderer = RENDERERS[self.active_type]
+        for profile in frame_profiles(self.profile_list, self.width, self.height):
+            with stage("geometry"):
+                corners = corner_blocks(self.size, kind, profile.width, profile.height)
+            for corner, (x, y, w, h) in corners.items():
+                prefix = f"Pip_{corner.name}"
+                tpl = renderer.render(
+                    x=to_percent(x, profile.width),
+                    y=to_percent(y, profile.height),
+                    height=to_percent(h, profile.height),
+                    width=to_percent(w, profile.width),
+                )
+                name = profile_name(profile, f"{prefix}_{self.filename}")
+                yield PresetRecord(self.active_type, name, tpl)
 
 
 def register() -> None:
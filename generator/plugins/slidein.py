@@ -1,30 +1,32 @@
 """ slidein preset generator """
 
-from string import Template
-import urllib
-
 from collections import namedtuple
 from dataclasses import dataclass
-from pathlib import Path
+from typing import Iterator
 from generator.calc import (
-    CROP_BLOCKS,
-    MASK_BLOCKS,
-    BlockCalc,
+    corner_blocks,
     BlockType,
     PresetType,
 )
 from generator.preset import factory
-from generator.preset.utils import get_input_values, to_percent
-from generator.preset.types import InputValue
+from generator.preset.keyframes import Keyframe, animate, format_keyframes
+from generator.preset.utils import format_size, get_input_values, to_percent
+from generator.preset.preview import Layout, corner_layout
+from generator.preset.profiles import Profile, frame_profiles, parse_profiles, profile_name
+from generator.preset.render import compile_presets
+from generator.preset.report import stage
+from generator.preset.sinks import open_sink, write_presets
+from generator.preset.types import InputValue, PresetRecord, PresetSink
+from generator.preset.writer import LogMode
 
 PRESET = {
     PresetType.CROP_RECTANGLE: """---
-rect: 0=$x_start $y_start 0 0 1;$frame_in=$x_end $y_end $width $height 1;$frame_out=$x_end $y_end $width $height 1;$frame_end=$x_start $y_start 0 0 1
-radius: 0=0;$frame_in=0;$frame_out=0;$frame_end=0
+rect: $rect
+radius: $radius
 color: "#00000000"
 "shotcut:animIn": "00:00:01.000"
 "shotcut:animOut": "00:00:01.000"
-..."""  # noqa
+..."""
 }
 
 PRESET_BORDER = {
@@ -37,6 +39,11 @@ color: "#00000000"
 ..."""
 }
 
+RENDERER = compile_presets(PRESET)
+RENDERER_BORDER = compile_presets(PRESET_BORDER)
+
+DEFAULT_TOLERANCE = 0.5
+
 StartMod = namedtuple("StartMod", ["dw", "dh"])
 
 START_POINTS = {
@@ -58,18 +65,40 @@ class SlideInPreset:
     padding: round
     values: list[InputValue] = None
     output: str = "./shotcut"
+    log: LogMode = LogMode.VERBOSE
+    io_threads: int = 0
+    easing: str = "linear"
+    # largest difference in pixels of the reduced keyframes to the eased motion
+    tolerance: float = DEFAULT_TOLERANCE
+    # comma separated profile names, every profile is emitted as own preset set
+    profiles: str = ""
+    profile_list: list[Profile] = None
+    # shown in the GUI, set from presets.json
+    description: str = ""
     active_type: PresetType = PresetType.CROP_RECTANGLE
 
     def setup(self, settings: namedtuple) -> None:
         self.output = settings.output
+        self.io_threads = settings.io_threads
 
-    def generate(self) -> None:
+    def presets(self) -> Iterator[PresetRecord]:
         values: namedtuple = get_input_values(self.values)
         self.size = values.size
         self.fps = values.fps
         self.duration = values.duration
-        self.calc_crop_preset()
-        self.calc_crop_border_preset()
+        self.easing = values.easing
+        self.tolerance = values.tolerance
+        self.profile_list = parse_profiles(values.profiles)
+        for profile in frame_profiles(self.profile_list, self.width, self.height):
+            yield from self.calc_crop_preset(profile)
+            yield from self.calc_crop_border_preset(profile)
+
+    def generate(self, sink: PresetSink = None) -> None:
+        if sink:
+            write_presets(self.presets(), sink)
+        else:
+            with open_sink(self.output, self.log, self.io_threads) as sink:
+                write_presets(self.presets(), sink)
 
     def inputs(self) -> list[InputValue]:
         if not self.values:
@@ -77,15 +106,25 @@ class SlideInPreset:
                 InputValue("size", "Size(%)", float, self.size),
                 InputValue("duration", "Duration", int, self.duration),
                 InputValue("fps", "FPS", int, self.fps),
+                InputValue("easing", "Easing", str, self.easing),
+                InputValue("tolerance", "Tolerance (px)", float, self.tolerance),
+                InputValue("profiles", "Profiles (1080p,4K,8K,Vertical)", str, self.profiles),
             ]
         return self.values
 
     def types(self) -> list(PresetType):
         return [PresetType.CROP_RECTANGLE]
 
-    @property
-    def description(self) -> str:
-        return "Slide in from corners"
+    def count(self) -> int:
+        """Number of presets generated for the active type"""
+        values: namedtuple = get_input_values(self.inputs())
+        count = len(corner_blocks(values.size, "crop")) + len(corner_blocks(values.size, "mask"))
+        return count * max(len(parse_profiles(values.profiles)), 1)
+
+    def layout(self) -> Layout:
+        """Rectangles of the presets for the current inputs"""
+        values: namedtuple = get_input_values(self.inputs())
+        return corner_layout(values.size, "crop", self.width, self.height)
 
     @property
     def frame_end(self):
@@ -101,58 +140,76 @@ class SlideInPreset:
 
     @property
     def filename(self):
-        return f"{self.size:.0f}%_{self.fps}fps_{self.duration}s"  # noqa
+        return f"{format_size(self.size)}%_{self.fps}fps_{self.duration}s"  # noqa
+
+    @property
+    def motion(self):
+        # only the slide in is eased, linear presets keep the names from before easing
+        if self.easing == "linear":
+            return ""
+        if self.tolerance != DEFAULT_TOLERANCE:
+            return f"_{self.easing}_{self.tolerance:g}px"
+        return f"_{self.easing}"
+
+    def format_rect(self, values: tuple[float, ...], profile: Profile) -> str:
+        x, y, width, height = values
+        # a zero size is written as 0, like the fixed keyframes before easing
+        return " ".join(
+            (
+                to_percent(x, profile.width),
+                to_percent(y, profile.height),
+                to_percent(width, profile.width) if width else "0",
+                to_percent(height, profile.height) if height else "0",
+                "1",
+            )
+        )
 
-    def calc_crop_preset(self):
-        calculator = BlockCalc(size=self.size)
-        for corner in CROP_BLOCKS.keys():
+    def calc_crop_preset(self, profile: Profile) -> Iterator[PresetRecord]:
+        renderer = RENDERER[self.active_type]
+        with stage("geometry"):
+            corners = corner_blocks(self.size, "crop", profile.width, profile.height)
+        for corner, (x, y, w, h) in corners.items():
             prefix = f"SlideIn_{corner.name}"
-            template = Template(PRESET[self.active_type])
-            x, y, w, h = calculator.calc_crop(corner)
             mod = START_POINTS[corner]
-            tpl = template.substitute(
-                x_start=to_percent(x + (mod.dw * self.height), self.width),
-                y_start=to_percent(y + (mod.dh * self.height), self.height),
-                x_end=to_percent(x, self.width),
-                y_end=to_percent(y, self.height),
-                frame_in=self.frame_in,
-                frame_out=self.frame_out,
-                frame_end=self.frame_end,
-                height=to_percent(h, self.height),
-                width=to_percent(w, self.width),
+            start = (x + (mod.dw * profile.height), y + (mod.dh * profile.height), 0, 0)
+            end = (x, y, w, h)
+            with stage("geometry"):
+                keyframes = animate(
+                    [
+                        Keyframe(0, start),
+                        Keyframe(self.frame_in, end),
+                        Keyframe(self.frame_out, end),
+                        Keyframe(self.frame_end, start),
+                    ],
+                    self.easing,
+                    self.tolerance,
+                )
+            tpl = renderer.render(
+                rect=format_keyframes(keyframes, lambda values: self.format_rect(values, profile)),
+                radius=";".join(f"{keyframe.frame}=0" for keyframe in keyframes),
             )
-            self.write_preset(f"{prefix}_{self.filename}", tpl)
-
-    def calc_crop_border_preset(self):
-        calculator = BlockCalc(size=self.size)
-        for corner in MASK_BLOCKS.keys():
+            name = profile_name(profile, f"{prefix}_{self.filename}{self.motion}")
+            yield PresetRecord(self.active_type, name, tpl)
+
+    def calc_crop_border_preset(self, profile: Profile) -> Iterator[PresetRecord]:
+        renderer = RENDERER_BORDER[self.active_type]
+        with stage("geometry"):
+            corners = corner_blocks(self.size, "mask", profile.width, profile.height)
+        for corner, (x, y, w, h) in corners.items():
             prefix = f"SlideIn_{corner.name}_B"
-            template = Template(PRESET_BORDER[self.active_type])
-            x, y, w, h = calculator.calc_mask(corner)
-            tpl = template.substitute(
-                x_start=to_percent(x, self.width),
-                y_start=to_percent(y, self.height),
-                x_end=to_percent(x, self.width),
-                y_end=to_percent(y, self.height),
+            tpl = renderer.render(
+                x_start=to_percent(x, profile.width),
+                y_start=to_percent(y, profile.height),
+                x_end=to_percent(x, profile.width),
+                y_end=to_percent(y, profile.height),
                 frame_in=self.frame_in,
                 frame_out=self.frame_out,
                 frame_end=self.frame_end,
-                height=to_percent(h, self.height),
-                width=to_percent(w, self.width),
+                height=to_percent(h, profile.height),
+                width=to_percent(w, profile.width),
             )
-            self.write_preset(f"{prefix}_{self.filename}_Border", tpl)
-
-    def write_preset(self, name: str, preset: str):
-        qf_name = urllib.parse.quote_plus(name)
-        directory = (
-            Path(self.output).expanduser() / Path("presets") / Path(self.active_type)
-        )
-        if not directory.exists():
-            directory.mkdir(parents=True, exist_ok=True)
-        path = directory / Path(qf_name)
-        print(f"create preset {name} : {path.resolve().name} in {directory}")
-        with open(path.resolve(), "w") as out_file:
-            out_file.write(preset)
+            name = profile_name(profile, f"{prefix}_{self.filename}_Border")
+            yield PresetRecord(self.active_type, name, tpl)
 
 
 def register() -> None:
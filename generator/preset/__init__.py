@@ -4,6 +4,7 @@ from pathlib import Path
 
 from generator.preset import factory, loader
 from generator.preset.types import PresetGenerator
+from generator.preset.writer import LogMode, PresetWriter  # noqa: F401
 from generator import DATA_DIR
 from generator.preset.utils import dict_to_namedtuple
 
@@ -14,11 +15,13 @@ def load_presets() -> list[PresetGenerator]:
     with file_name.open("r") as file:
         data = json.load(file)
 
-        # load the plugins
+        # register the plugins, installed plugins first so the
+        # configured modules take precedence
+        loader.discover_plugins()
         loader.load_plugins(data["plugins"])
 
-        # create the generators
-        presets = [factory.create(item) for item in data["generators"]]
+        # the generators are created and their plugins imported on first use
+        presets = [factory.create_lazy(item) for item in data["generators"]]
 
         settings = dict_to_namedtuple(data["settings"])
         # run setup on generators
@@ -0,0 +1,123 @@
+"""Compare generated presets with an output directory without writing."""
+
+import os
+import urllib.parse
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from generator.calc import PresetType
+from generator.preset.manifest import Manifest, content_hash
+from generator.preset.profiles import PROFILES
+from generator.preset.writer import file_bytes
+
+CATEGORIES = ("added", "changed", "unchanged", "stale")
+
+
+def name_prefix(name: str) -> str:
+    """The generator part of a preset name, like Pip for 4K_Pip_TopLeft_50%"""
+    head, _, rest = name.partition("_")
+    if head in PROFILES and rest:
+        head = rest.partition("_")[0]
+    return head
+
+
+@dataclass
+class DiffSink:
+    """Sink comparing the presets with <output>/presets/<PresetType>/
+
+    Every type directory is listed once. A preset with a different file
+    size is changed without reading the file, with the same size the
+    content hash is compared with the manifest, and only files missing
+    from the manifest are read. The presets are compared as the writer
+    writes them, in text mode. On close, the files in the compared
+    directories that are in the manifest, were not generated and have the
+    name prefix of a generated preset are counted as stale. Presets of
+    other generators or made by the user are never stale.
+    """
+
+    output: str
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(CATEGORIES, 0))
+    bytes: dict[str, int] = field(default_factory=lambda: dict.fromkeys(CATEGORIES, 0))
+    names: dict[str, list[str]] = field(
+        default_factory=lambda: {category: [] for category in CATEGORIES}
+    )
+    _listings: dict[PresetType, dict[str, int]] = field(default_factory=dict, repr=False)
+    _seen: dict[PresetType, set[str]] = field(default_factory=dict, repr=False)
+    _prefixes: set[str] = field(default_factory=set, repr=False)
+    _manifest: Manifest = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self._manifest = Manifest.load(self.output)
+
+    def __enter__(self) -> "DiffSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def directory(self, preset_type: PresetType) -> Path:
+        return Path(self.output).expanduser() / Path("presets") / Path(preset_type)
+
+    def listing(self, preset_type: PresetType) -> dict[str, int]:
+        """Return the file sizes in the directory of a preset type, listed once"""
+        try:
+            return self._listings[preset_type]
+        except KeyError:
+            listing = {}
+            try:
+                with os.scandir(self.directory(preset_type)) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            listing[entry.name] = entry.stat().st_size
+            except FileNotFoundError:
+                pass
+            self._listings[preset_type] = listing
+            self._seen[preset_type] = set()
+            return listing
+
+    def add(self, category: str, name: str, size: int) -> None:
+        self.counts[category] += 1
+        self.bytes[category] += size
+        self.names[category].append(name)
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        qf_name = urllib.parse.quote_plus(name)
+        listing = self.listing(preset_type)
+        self._seen[preset_type].add(qf_name)
+        self._prefixes.add(name_prefix(name))
+        data = file_bytes(preset)
+        size = listing.get(qf_name)
+        key = f"presets/{preset_type}/{qf_name}"
+        if size is None:
+            self.add("added", key, len(data))
+        elif size != len(data):
+            self.add("changed", key, len(data))
+        elif key in self._manifest.entries:
+            if self._manifest.unchanged(key, content_hash(preset)):
+                self.add("unchanged", key, len(data))
+            else:
+                self.add("changed", key, len(data))
+        else:
+            with open(self.directory(preset_type) / qf_name, "rb") as file:
+                same = file.read() == data
+            self.add("unchanged" if same else "changed", key, len(data))
+
+    def close(self) -> None:
+        for preset_type, listing in self._listings.items():
+            seen = self._seen[preset_type]
+            for qf_name, size in listing.items():
+                key = f"presets/{preset_type}/{qf_name}"
+                if (
+                    qf_name not in seen
+                    and key in self._manifest.entries
+                    and name_prefix(urllib.parse.unquote_plus(qf_name)) in self._prefixes
+                ):
+                    self.add("stale", key, size)
+        self._listings.clear()
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{self.counts[category]} {category} ({self.bytes[category]} bytes)"
+            for category in CATEGORIES
+        )
@@ -1,6 +1,7 @@
 """Factory for creating a preset generatro."""
 
 from typing import Any, Callable
+from generator.preset import loader
 from generator.preset.types import PresetGenerator
 
 preset_creation_funcs: dict[str, Callable[..., PresetGenerator]] = {}
@@ -16,12 +17,92 @@ def unregister(preset_type: str) -> None:
     preset_creation_funcs.pop(preset_type, None)
 
 
+def get_creator(preset_type: str) -> Callable[..., PresetGenerator]:
+    """Return the creator of a type, import the plugin module on first use."""
+    try:
+        return preset_creation_funcs[preset_type]
+    except KeyError:
+        pass
+    try:
+        module_name = loader.plugin_modules[preset_type]
+    except KeyError:
+        raise ValueError(f"unknown character type {preset_type!r}") from None
+    loader.load_plugin(module_name)
+    try:
+        return preset_creation_funcs[preset_type]
+    except KeyError:
+        raise ValueError(
+            f"plugin {module_name!r} does not register type {preset_type!r}"
+        ) from None
+
+
 def create(arguments: dict[str, Any]) -> PresetGenerator:
     """Create a preset generator of a specific type, given JSON data."""
     args_copy = arguments.copy()
     preset_type = args_copy.pop("type")
-    try:
-        creator_func = preset_creation_funcs[preset_type]
-    except KeyError:
-        raise ValueError(f"unknown character type {preset_type!r}") from None
+    creator_func = get_creator(preset_type)
     return creator_func(**args_copy)
+
+
+def _unwrap(generator: PresetGenerator) -> PresetGenerator:
+    return generator
+
+
+class LazyGenerator:
+    """A preset generator created on first use.
+
+    The name and description are taken from the JSON data, so a
+    generator can be listed without importing its plugin. Setup is
+    deferred until the generator is created.
+    """
+
+    def __init__(self, arguments: dict[str, Any]) -> None:
+        object.__setattr__(self, "_arguments", arguments.copy())
+        object.__setattr__(self, "_generator", None)
+        object.__setattr__(self, "_settings", None)
+
+    @property
+    def name(self) -> str:
+        return self._arguments["name"]
+
+    @property
+    def description(self) -> str:
+        if "description" in self._arguments:
+            return self._arguments["description"]
+        return self.generator.description
+
+    @property
+    def loaded(self) -> bool:
+        return self._generator is not None
+
+    @property
+    def generator(self) -> PresetGenerator:
+        if self._generator is None:
+            generator = create(self._arguments)
+            if self._settings is not None:
+                generator.setup(self._settings)
+            object.__setattr__(self, "_generator", generator)
+        return self._generator
+
+    def setup(self, settings) -> None:
+        if self._generator is None:
+            object.__setattr__(self, "_settings", settings)
+        else:
+            self._generator.setup(settings)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.generator, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.generator, name, value)
+
+    def __reduce_ex__(self, protocol):
+        # pickle the generator itself, e.g. for a process pool
+        return _unwrap, (self.generator,)
+
+
+def create_lazy(arguments: dict[str, Any]) -> LazyGenerator:
+    """Create a preset generator that is only created on first use."""
+    return LazyGenerator(arguments)
@@ -0,0 +1,98 @@
+"""Keyframe animation with easing curves and keyframe reduction."""
+
+from array import array
+from typing import Callable, NamedTuple, Sequence
+
+EASINGS: dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: t * (2 - t),
+    "ease_in_out": lambda t: 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t),
+    "ease_in_cubic": lambda t: t * t * t,
+    "ease_out_cubic": lambda t: 1 - (1 - t) ** 3,
+    "ease_in_out_cubic": lambda t: 4 * t * t * t if t < 0.5 else 1 - 4 * (1 - t) ** 3,
+}
+
+
+class Keyframe(NamedTuple):
+    frame: int
+    values: tuple[float, ...]
+
+
+def sample(keyframes: Sequence[Keyframe], easing: str = "linear") -> list[array]:
+    """Values of every frame from the first to the last keyframe, one column per value
+
+    The eased position of a segment is calculated once for all frames
+    and shared by all values.
+    """
+    try:
+        ease = EASINGS[easing]
+    except KeyError:
+        raise ValueError(f"unknown easing {easing!r}, available: {', '.join(EASINGS)}") from None
+    columns = [array("d") for _ in keyframes[0].values]
+    for start, end in zip(keyframes, keyframes[1:]):
+        length = end.frame - start.frame
+        steps = [ease(ndx / length) for ndx in range(length)]
+        for column, first, last in zip(columns, start.values, end.values):
+            delta = last - first
+            column.extend([first + delta * step for step in steps])
+    for column, value in zip(columns, keyframes[-1].values):
+        column.append(value)
+    return columns
+
+
+def reduce(columns: list[array], tolerance: float, first_frame: int = 0) -> list[Keyframe]:
+    """The fewest keyframes whose linear interpolation stays within tolerance of the samples
+
+    Ramer-Douglas-Peucker over time, the error of a frame is the largest
+    difference of its values with the interpolation at the same frame.
+    """
+    last = len(columns[0]) - 1
+    keep = {0, last}
+    segments = [(0, last)]
+    while segments:
+        low, high = segments.pop()
+        if high - low < 2:
+            continue
+        worst = tolerance
+        split = None
+        span = high - low
+        for ndx in range(low + 1, high):
+            part = (ndx - low) / span
+            error = max(
+                abs(column[ndx] - (column[low] + (column[high] - column[low]) * part))
+                for column in columns
+            )
+            if error > worst:
+                worst = error
+                split = ndx
+        if split is not None:
+            keep.add(split)
+            segments.append((split, high))
+            segments.append((low, split))
+    return [
+        Keyframe(first_frame + ndx, tuple(column[ndx] for column in columns))
+        for ndx in sorted(keep)
+    ]
+
+
+def animate(
+    keyframes: Sequence[Keyframe], easing: str = "linear", tolerance: float = 0.5
+) -> list[Keyframe]:
+    """Sample the eased motion between the keyframes and reduce it to the fewest keyframes
+
+    With linear easing the result are the keyframes of the motion, without
+    the ones that lie on a straight line. Keyframes that are not in frame
+    order are returned unchanged.
+    """
+    frames = [keyframe.frame for keyframe in keyframes]
+    if len(keyframes) < 2 or any(b <= a for a, b in zip(frames, frames[1:])):
+        return list(keyframes)
+    return reduce(sample(keyframes, easing), tolerance, frames[0])
+
+
+def format_keyframes(
+    keyframes: Sequence[Keyframe], format_values: Callable[[tuple[float, ...]], str]
+) -> str:
+    """MLT animated property like 0=x y w h 1;30=x y w h 1"""
+    return ";".join(f"{keyframe.frame}={format_values(keyframe.values)}" for keyframe in keyframes)
@@ -1,6 +1,13 @@
 """A simple plugin loader."""
 import importlib
 
+from importlib.metadata import entry_points
+
+ENTRY_POINT_GROUP = "preset_generator.plugins"
+
+# plugin module for every generator type, imported on first use
+plugin_modules: dict[str, str] = {}
+
 
 class ModuleInterface:
     """Represents a plugin interface. A plugin has a single register function."""
@@ -15,8 +22,33 @@ def import_module(name: str) -> ModuleInterface:
     return importlib.import_module(name)  # type: ignore
 
 
-def load_plugins(plugins: list[str]) -> None:
-    """Loads the plugins defined in the plugins list."""
+def register_module(preset_type: str, module_name: str) -> None:
+    """Register the plugin module of a generator type without importing it."""
+    plugin_modules[preset_type] = module_name
+
+
+def load_plugin(module_name: str) -> None:
+    """Imports a plugin and runs its register function."""
+    plugin = import_module(module_name)
+    plugin.register()
+
+
+def load_plugins(plugins: list[str] | dict[str, str]) -> None:
+    """Loads the plugins defined in the plugins list.
+
+    A dict maps generator types to plugin modules, which are only
+    imported when a generator of the type is created.
+    """
+    if isinstance(plugins, dict):
+        for preset_type, module_name in plugins.items():
+            register_module(preset_type, module_name)
+        return
     for plugin_file in plugins:
-        plugin = import_module(plugin_file)
-        plugin.register()
+        load_plugin(plugin_file)
+
+
+def discover_plugins(group: str = ENTRY_POINT_GROUP) -> None:
+    """Registers the plugins of installed packages, the entry point name
+    is the generator type and the value the plugin module."""
+    for entry_point in entry_points(group=group):
+        register_module(entry_point.name, entry_point.module)
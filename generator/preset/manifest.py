@@ -0,0 +1,57 @@
+"""Manifest of the presets written to an output directory."""
+
+import hashlib
+import json
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+MANIFEST_NAME = ".preset_generator_manifest.json"
+
+
+def content_hash(preset: str) -> str:
+    return hashlib.sha1(preset.encode()).hexdigest()
+
+
+@dataclass
+class Manifest:
+    """Content hash of every preset, keyed on the path relative to the output dir"""
+
+    path: Path
+    entries: dict[str, str] = field(default_factory=dict)
+    updates: dict[str, str] = field(default_factory=dict)
+    changed: bool = False
+
+    @classmethod
+    def load(cls, output: str) -> "Manifest":
+        path = Path(output).expanduser() / MANIFEST_NAME
+        try:
+            with path.open("r") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            entries = {}
+        return cls(path, entries)
+
+    def unchanged(self, name: str, digest: str) -> bool:
+        return self.entries.get(name) == digest
+
+    def update(self, name: str, digest: str) -> None:
+        if self.entries.get(name) != digest:
+            self.entries[name] = digest
+            self.updates[name] = digest
+            self.changed = True
+
+    def merge(self, updates: dict[str, str]) -> None:
+        """Merge the updates made by a writer in another process"""
+        for name, digest in updates.items():
+            self.update(name, digest)
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w") as file:
+            json.dump(self.entries, file, indent=0, sort_keys=True)
+        tmp_path.replace(self.path)
+        self.changed = False
@@ -0,0 +1,34 @@
+"""Rectangles of the generated presets for the layout preview, without Qt."""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+from generator.calc import GridCalculator, corner_blocks
+
+
+class Layout(NamedTuple):
+    """Rectangles (x, y, width, height) in a frame of width x height pixels"""
+
+    width: int
+    height: int
+    rects: tuple[tuple[int, int, int, int], ...]
+
+
+@lru_cache(maxsize=256)
+def grid_layout(rows: int, columns: int, width: int, height: int) -> Layout:
+    """The cells of a grid, cached per parameter tuple"""
+    if rows < 1 or columns < 1:
+        raise ValueError(f"invalid grid {columns}x{rows}")
+    grid = GridCalculator(rows, columns, width, height)
+    rects = tuple(
+        grid.calc_block(row, col, 1, 1) for row in range(rows) for col in range(columns)
+    )
+    return Layout(width, height, rects)
+
+
+@lru_cache(maxsize=256)
+def corner_layout(size: float, kind: str, width: int = 3840, height: int = 2160) -> Layout:
+    """The corner blocks of a kind, cached per parameter tuple"""
+    if not 0 < size <= 100:
+        raise ValueError(f"invalid size {size}")
+    return Layout(width, height, tuple(corner_blocks(size, kind, width, height).values()))
@@ -0,0 +1,43 @@
+"""Frame resolutions the presets can be generated for."""
+
+from typing import NamedTuple
+
+
+class Profile(NamedTuple):
+    name: str
+    width: int
+    height: int
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        Profile("1080p", 1920, 1080),
+        Profile("4K", 3840, 2160),
+        Profile("8K", 7680, 4320),
+        Profile("Vertical", 1080, 1920),
+    )
+}
+
+
+def parse_profiles(text: str) -> list[Profile]:
+    """Profiles from a comma separated list of names, empty for none"""
+    profiles = []
+    for name in filter(None, (part.strip() for part in text.split(","))):
+        try:
+            profiles.append(PROFILES[name])
+        except KeyError:
+            raise ValueError(
+                f"unknown profile {name!r}, available: {', '.join(PROFILES)}"
+            ) from None
+    return profiles
+
+
+def frame_profiles(profiles: list[Profile], width: int, height: int) -> list[Profile]:
+    """Profiles to generate, the configured frame without a name if none are selected"""
+    return profiles or [Profile("", width, height)]
+
+
+def profile_name(profile: Profile, name: str) -> str:
+    """Name of a preset in the preset set of a profile"""
+    return f"{profile.name}_{name}" if profile.name else name
@@ -0,0 +1,59 @@
+"""Preset templates compiled to fast formatters."""
+
+from functools import lru_cache
+from string import Template
+from typing import Iterable
+
+from generator.calc import PresetType
+
+
+class Renderer:
+    """A string.Template compiled to a positional str.format formatter
+
+    The placeholders are numbered in the order of their first use, the
+    values of a row passed to render_row must be in the order of fields.
+    """
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        self.fields: list[str] = []
+        parts = []
+        last = 0
+        for match in Template.pattern.finditer(template):
+            parts.append(template[last : match.start()].replace("{", "{{").replace("}", "}}"))
+            last = match.end()
+            if match.group("escaped") is not None:
+                parts.append("$")
+                continue
+            name = match.group("named") or match.group("braced")
+            if name is None:
+                raise ValueError(f"invalid placeholder in template at {match.start()}")
+            if name not in self.fields:
+                self.fields.append(name)
+            parts.append(f"{{{self.fields.index(name)}}}")
+        parts.append(template[last:].replace("{", "{{").replace("}", "}}"))
+        self._format = "".join(parts).format
+
+    def render(self, **values) -> str:
+        """Render like Template.substitute"""
+        return self._format(*[values[name] for name in self.fields])
+
+    def render_row(self, row: tuple) -> str:
+        return self._format(*row)
+
+    def render_rows(self, rows: Iterable[tuple], buffer: list[str]) -> list[str]:
+        """Render a batch of rows into buffer, replacing its content"""
+        buffer.clear()
+        buffer.extend(self._format(*row) for row in rows)
+        return buffer
+
+
+@lru_cache(maxsize=None)
+def get_renderer(template: str) -> Renderer:
+    """Return the compiled renderer for a template, compiled only once"""
+    return Renderer(template)
+
+
+def compile_presets(presets: dict[PresetType, str]) -> dict[PresetType, Renderer]:
+    """Compile the template of every preset type"""
+    return {preset_type: get_renderer(text) for preset_type, text in presets.items()}
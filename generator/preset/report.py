@@ -0,0 +1,142 @@
+"""Timing of the generation stages and the run report."""
+
+import cProfile
+import json
+import time
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+STAGES = ("geometry", "render", "quote", "write")
+
+
+@dataclass
+class GeneratorReport:
+    """Stage times and output counters of one generator run"""
+
+    name: str
+    preset_type: str
+    presets: int = 0
+    files: int = 0
+    bytes: int = 0
+    directories: int = 0
+    seconds: float = 0.0
+    stages: dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] += seconds
+
+    def merge(self, other: "GeneratorReport") -> None:
+        """Add the counters and stage times of a shard run in another process"""
+        self.presets += other.presets
+        self.count_output(other.files, other.bytes, other.directories)
+        self.seconds += other.seconds
+        for name, seconds in other.stages.items():
+            self.add(name, seconds)
+
+    def count_output(self, files: int, bytes: int, directories: int = 0) -> None:
+        self.files += files
+        self.bytes += bytes
+        self.directories += directories
+
+
+# the report of the generator running in this process, None when not profiling
+_current: GeneratorReport = None
+
+
+def current() -> GeneratorReport | None:
+    return _current
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the time spent in the block to a stage of the current report"""
+    report = _current
+    if report is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def report_generator(
+    report: GeneratorReport, profile: str = None
+) -> Iterator[GeneratorReport]:
+    """Make report the current report, optionally capture a cProfile to a file"""
+    global _current
+    profiler = cProfile.Profile() if profile else None
+    _current = report
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield report
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        report.seconds += time.perf_counter() - start
+        _current = None
+
+
+@dataclass
+class RunReport:
+    """Report of all generators run by one Generate click or batch invocation"""
+
+    generators: list[GeneratorReport] = field(default_factory=list)
+    started: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @contextmanager
+    def generator(
+        self, name: str, preset_type: str, profile: str = None
+    ) -> Iterator[GeneratorReport]:
+        report = GeneratorReport(name, str(preset_type))
+        self.generators.append(report)
+        with report_generator(report, profile):
+            yield report
+
+    def totals(self) -> dict:
+        totals = {
+            "presets": 0,
+            "files": 0,
+            "bytes": 0,
+            "directories": 0,
+            "seconds": 0.0,
+            "stages": dict.fromkeys(STAGES, 0.0),
+        }
+        for report in self.generators:
+            for key in ("presets", "files", "bytes", "directories", "seconds"):
+                totals[key] += getattr(report, key)
+            for name, seconds in report.stages.items():
+                totals["stages"][name] += seconds
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "generators": [asdict(report) for report in self.generators],
+            "totals": self.totals(),
+        }
+
+    def save(self, path: str) -> None:
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def summary(self) -> str:
+        totals = self.totals()
+        stages = ", ".join(
+            f"{name} {seconds * 1000:.1f}ms" for name, seconds in totals["stages"].items()
+        )
+        return (
+            f"{totals['presets']} presets, {totals['files']} files, "
+            f"{totals['bytes']} bytes in {totals['seconds']:.3f}s ({stages})"
+        )
@@ -0,0 +1,108 @@
+"""Generate the presets of one generator in shards in a process pool."""
+
+import threading
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+from generator.preset.manifest import Manifest
+from generator.preset.report import current
+from generator.preset.sinks import GenerationCancelled, write_presets
+from generator.preset.types import PresetGenerator
+from generator.preset.writer import LogMode, PresetWriteError, PresetWriter
+
+
+@dataclass
+class ShardResult:
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    updates: dict[str, str] = field(default_factory=dict)
+    errors: list[tuple[str, OSError]] = field(default_factory=list)
+
+
+def split_weighted(weights: Sequence[int], parts: int) -> list[range]:
+    """Split the indexes of weights in contiguous ranges of about equal weight"""
+    target = sum(weights) / max(parts, 1)
+    ranges = []
+    start = 0
+    weight = 0
+    for ndx, value in enumerate(weights):
+        weight += value
+        if weight >= target * (len(ranges) + 1) and ndx + 1 < len(weights):
+            ranges.append(range(start, ndx + 1))
+            start = ndx + 1
+    ranges.append(range(start, len(weights)))
+    return [cells for cells in ranges if cells]
+
+
+def write_shard(
+    preset: PresetGenerator, threads: int = 0, log: LogMode = LogMode.QUIET
+) -> ShardResult:
+    """Write the presets of a shard, the manifest is saved by the caller"""
+    writer = PresetWriter(preset.output, log, save_manifest=False, threads=threads)
+    try:
+        with writer:
+            write_presets(preset.presets(), writer)
+    except PresetWriteError:
+        pass
+    return ShardResult(
+        writer.files, writer.bytes, writer.skipped, writer.manifest.updates, writer.errors
+    )
+
+
+def generate_shards(
+    shards: list[PresetGenerator],
+    output: str,
+    workers: int,
+    threads: int = 0,
+    log: LogMode = LogMode.VERBOSE,
+    progress: Callable[[int, int], None] = None,
+    cancel: threading.Event = None,
+) -> ShardResult:
+    """Write the shards in a process pool and save the merged manifest
+
+    Every worker writes its own files, only the counters and manifest
+    updates are sent back. progress is called with the presets and bytes
+    written after every shard. When cancel is set, the shards not started
+    yet are dropped and GenerationCancelled is raised once the running
+    shards are done.
+    """
+    manifest = Manifest.load(output)
+    total = ShardResult()
+    shard_log = LogMode.VERBOSE if log == LogMode.VERBOSE else LogMode.QUIET
+    cancelled = False
+    with ProcessPoolExecutor(workers) as executor:
+        pending = {executor.submit(write_shard, shard, threads, shard_log) for shard in shards}
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                result = future.result()
+                total.files += result.files
+                total.bytes += result.bytes
+                total.skipped += result.skipped
+                total.errors.extend(result.errors)
+                manifest.merge(result.updates)
+                if progress:
+                    progress(total.files + total.skipped, total.bytes)
+            if cancel is not None and cancel.is_set() and not cancelled:
+                cancelled = True
+                for future in pending:
+                    future.cancel()
+    manifest.save()
+    if report := current():
+        report.presets += total.files + total.skipped
+        report.count_output(total.files, total.bytes)
+    if cancelled:
+        raise GenerationCancelled(f"cancelled after {total.files + total.skipped} presets")
+    if log == LogMode.SUMMARY:
+        print(
+            f"created {total.files} presets ({total.bytes} bytes), "
+            f"{total.skipped} unchanged in {len(shards)} shards"
+        )
+    if total.errors:
+        raise PresetWriteError(total.errors)
+    return total
@@ -0,0 +1,92 @@
+"""Grid spans in shared memory, read by the shard workers without copies."""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+from generator.calc import GridSpans
+
+FIELDS = tuple(GridSpans.__dataclass_fields__)
+# the columns are arrays of type "i"
+ITEM_SIZE = 4
+
+
+@dataclass(frozen=True)
+class SharedSpans:
+    """Name and length of a SpanBlock, the only data pickled for a worker"""
+
+    name: str
+    length: int
+
+    def attach(self) -> "AttachedSpans":
+        return AttachedSpans(self)
+
+
+class SpanBlock:
+    """Shared memory block with the columns of GridSpans, unlinked on close"""
+
+    def __init__(self, spans: GridSpans) -> None:
+        length = len(spans)
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=max(length * ITEM_SIZE * len(FIELDS), ITEM_SIZE)
+        )
+        for ndx, name in enumerate(FIELDS):
+            start = ndx * length * ITEM_SIZE
+            self._shm.buf[start : start + length * ITEM_SIZE] = getattr(spans, name).tobytes()
+        self.handle = SharedSpans(self._shm.name, length)
+
+    def __enter__(self) -> "SpanBlock":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+class AttachedSpans:
+    """GridSpans with memoryview columns on a SpanBlock
+
+    The views must not be used after close, views made by slicing them
+    must be gone before close.
+    """
+
+    def __init__(self, handle: SharedSpans) -> None:
+        self._shm = shared_memory.SharedMemory(handle.name)
+        length = handle.length
+        words = self._shm.buf.cast("i")
+        self._views = [words]
+        self.spans = GridSpans(
+            *(words[ndx * length : (ndx + 1) * length] for ndx in range(len(FIELDS)))
+        )
+        self._views.extend(vars(self.spans).values())
+
+    def __enter__(self) -> "AttachedSpans":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def cells(self, cells: range, columns: int) -> GridSpans:
+        """The spans starting in the cells, a contiguous range as spans are ordered by start cell"""
+        spans = self.spans
+        start, stop = (
+            bisect_left(
+                range(len(spans)),
+                cell,
+                key=lambda ndx: spans.row[ndx] * columns + spans.col[ndx],
+            )
+            for cell in (cells.start, cells.stop)
+        )
+        selected = GridSpans(*(column[start:stop] for column in vars(spans).values()))
+        self._views.extend(vars(selected).values())
+        return selected
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self.spans = None
+        self._shm.close()
@@ -0,0 +1,236 @@
+"""Sinks consuming the presets yielded by a generator.
+
+The Shotcut directory layout is written by generator.preset.writer.PresetWriter.
+"""
+
+import gzip
+import io
+import os
+import sys
+import tarfile
+import threading
+import time
+import urllib.parse
+import zipfile
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, TextIO
+
+from generator.calc import PresetType
+from generator.preset.report import GeneratorReport, current, stage
+from generator.preset.types import PresetRecord, PresetSink
+from generator.preset.writer import LogMode, PresetWriter
+
+TAR_MODES = {
+    ".tar": "w",
+    ".tar.gz": "w:gz",
+    ".tgz": "w:gz",
+    ".tar.bz2": "w:bz2",
+    ".tar.xz": "w:xz",
+}
+
+# 1980-01-01, the first date a zip member can have
+ZIP_EPOCH = 315532800
+
+
+def source_date_epoch() -> int:
+    """Timestamp of the archive members, SOURCE_DATE_EPOCH or 0"""
+    return int(os.environ.get("SOURCE_DATE_EPOCH", 0))
+
+
+@dataclass
+class MemorySink:
+    """Collect the presets in a list"""
+
+    records: list[PresetRecord] = field(default_factory=list)
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        self.records.append(PresetRecord(preset_type, name, preset))
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class StdoutSink:
+    """Print the presets, each preceded by its relative path"""
+
+    stream: TextIO = None
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(f"# presets/{preset_type}/{urllib.parse.quote_plus(name)}\n")
+        stream.write(f"{preset}\n")
+
+    def close(self) -> None:
+        (self.stream or sys.stdout).flush()
+
+
+@dataclass
+class ArchiveSink:
+    """Stream the presets into a single zip or tar archive
+
+    The members use the same presets/<PresetType>/<quoted name> layout
+    as the output directory, so unpacking the archive in the Shotcut
+    app data dir gives the same tree as PresetWriter.
+    All timestamps are SOURCE_DATE_EPOCH or 0, so the same presets give
+    the same archive on every run.
+    """
+
+    path: str
+    log: LogMode = LogMode.VERBOSE
+    files: int = 0
+    bytes: int = 0
+    mtime: int = field(default_factory=source_date_epoch)
+    _archive: zipfile.ZipFile | tarfile.TarFile = field(default=None, repr=False)
+    _fileobj: gzip.GzipFile = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        path = Path(self.path).expanduser()
+        mode = archive_mode(path.name)
+        if mode is None:
+            raise ValueError(f"{self.path} is not a zip or tar archive name")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if mode == "zip":
+            self._archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        elif mode == "w:gz":
+            # the gzip header has a timestamp, tarfile.open would use the current time
+            self._fileobj = gzip.GzipFile(path, "wb", mtime=self.mtime)
+            self._archive = tarfile.open(fileobj=self._fileobj, mode="w")
+        else:
+            self._archive = tarfile.open(path, mode)
+
+    def __enter__(self) -> "ArchiveSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        member = f"presets/{preset_type}/{urllib.parse.quote_plus(name)}"
+        data = preset.encode()
+        if self.log == LogMode.VERBOSE:
+            print(f"add preset {name} : {member}")
+        if report := current():
+            report.count_output(1, len(data))
+        if isinstance(self._archive, zipfile.ZipFile):
+            # zip dates start in 1980
+            info = zipfile.ZipInfo(member, time.gmtime(max(self.mtime, ZIP_EPOCH))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            info.mtime = self.mtime
+            self._archive.addfile(info, io.BytesIO(data))
+        self.files += 1
+        self.bytes += len(data)
+
+    def close(self) -> None:
+        if self._archive:
+            with stage("write"):
+                self._archive.close()
+                if self._fileobj:
+                    self._fileobj.close()
+            self._archive = None
+            self._fileobj = None
+            if self.log == LogMode.SUMMARY:
+                print(f"added {self.files} presets ({self.bytes} bytes) to {self.path}")
+
+
+def archive_mode(name: str) -> str | None:
+    """Return "zip" or the tarfile mode for an archive name, None for a directory"""
+    if name.endswith(".zip"):
+        return "zip"
+    for suffix, mode in TAR_MODES.items():
+        if name.endswith(suffix):
+            return mode
+    return None
+
+
+class GenerationCancelled(Exception):
+    """Raised by ProgressSink when the generation was cancelled"""
+
+
+@dataclass
+class ProgressSink:
+    """Pass the presets on to a sink, report the progress and stop on cancel
+
+    The callback gets the number of presets and bytes written, every
+    interval presets and when the sink is closed. Once cancel is set the
+    next write raises GenerationCancelled, which ends the write loop of
+    the generator.
+    """
+
+    sink: PresetSink
+    callback: Callable[[int, int], None]
+    cancel: threading.Event = field(default_factory=threading.Event)
+    interval: int = 256
+    presets: int = 0
+    bytes: int = 0
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        if self.cancel.is_set():
+            raise GenerationCancelled(f"cancelled after {self.presets} presets")
+        self.sink.write(preset_type, name, preset)
+        self.presets += 1
+        self.bytes += len(preset.encode())
+        if self.presets % self.interval == 0:
+            self.callback(self.presets, self.bytes)
+
+    def close(self) -> None:
+        self.callback(self.presets, self.bytes)
+        self.sink.close()
+
+
+def open_sink(
+    output: str, log: LogMode = LogMode.VERBOSE, threads: int = 0
+) -> PresetSink:
+    """Open an archive sink if output is an archive name, else a directory writer"""
+    if archive_mode(Path(output).name):
+        return ArchiveSink(output, log)
+    return PresetWriter(output, log, threads=threads)
+
+
+def write_presets(records: Iterable[PresetRecord], sink: PresetSink) -> int:
+    """Write all records to the sink, return the number of records written"""
+    report = current()
+    if report:
+        return write_presets_timed(records, sink, report)
+    count = 0
+    for preset_type, name, text in records:
+        sink.write(preset_type, name, text)
+        count += 1
+    return count
+
+
+def write_presets_timed(
+    records: Iterable[PresetRecord], sink: PresetSink, report: GeneratorReport
+) -> int:
+    """Write all records, add the generation time to render and sink time to write
+
+    The geometry and quote stages are timed where they happen, and are
+    subtracted from the render and write time measured here.
+    """
+    geometry = report.stages["geometry"]
+    quote = report.stages["quote"]
+    render_time = 0.0
+    write_time = 0.0
+    count = 0
+    records = iter(records)
+    while True:
+        start = time.perf_counter()
+        record = next(records, None)
+        written = time.perf_counter()
+        render_time += written - start
+        if record is None:
+            break
+        sink.write(*record)
+        write_time += time.perf_counter() - written
+        count += 1
+    report.add("render", render_time - (report.stages["geometry"] - geometry))
+    report.add("write", write_time - (report.stages["quote"] - quote))
+    report.presets += count
+    return count
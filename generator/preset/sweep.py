@@ -0,0 +1,66 @@
+"""Parameter sweeps over the inputs of a preset generator."""
+
+import itertools
+
+from typing import Any, Iterator
+
+from generator.preset.manifest import content_hash
+from generator.preset.types import InputValue, PresetGenerator, PresetRecord
+
+
+def parse_values(value: InputValue, text: str) -> list[Any]:
+    """Parse a list of values for an input
+
+    The text is either a comma separated list "24,25,30,60" or an
+    inclusive range "start:stop:step" like "10:90:5".
+    """
+    if ":" in text:
+        start, stop, step = (value.type(part) for part in text.split(":"))
+        if step <= 0 or stop < start:
+            raise ValueError(f"invalid range {text!r} for {value.name}")
+        # count the steps to avoid accumulating float errors
+        steps = int(round((stop - start) / step))
+        return [value.type(start + ndx * step) for ndx in range(steps + 1)]
+    return [value.type(part) for part in text.split(",")]
+
+
+def sweep(
+    preset: PresetGenerator, params: dict[str, list[Any]]
+) -> Iterator[PresetRecord]:
+    """Yield the presets for every combination of the parameter values
+
+    Presets with the same type, name and content as an earlier
+    combination are only yielded once. A preset with the name of an
+    earlier one but another content raises ValueError, as it would
+    overwrite it. The input values are restored when the sweep is done.
+    """
+    inputs = {value.name: value for value in preset.inputs()}
+    unknown = set(params) - set(inputs)
+    if unknown:
+        raise ValueError(f"{preset.name} has no parameters {sorted(unknown)}")
+    saved = {name: inputs[name].value for name in params}
+    # content hash and parameters of every yielded preset, by type and name
+    seen: dict[tuple[str, str], tuple[str, dict[str, Any]]] = {}
+    try:
+        for combination in itertools.product(*params.values()):
+            values = dict(zip(params, combination))
+            for name, value in values.items():
+                inputs[name].value = value
+            for record in preset.presets():
+                key = (record.preset_type, record.name)
+                digest = content_hash(record.text)
+                if key not in seen:
+                    seen[key] = (digest, values)
+                    yield record
+                elif seen[key][0] != digest:
+                    raise ValueError(
+                        f"{preset.name} preset {record.name!r} has the same name for "
+                        f"{format_params(seen[key][1])} and {format_params(values)}"
+                    )
+    finally:
+        for name, value in saved.items():
+            inputs[name].value = value
+
+
+def format_params(values: dict[str, Any]) -> str:
+    return ", ".join(f"{name}={value}" for name, value in values.items())
@@ -1,8 +1,11 @@
 from dataclasses import dataclass
-from typing import Any, Protocol, Type
+from typing import TYPE_CHECKING, Any, Iterator, NamedTuple, Protocol, Type
 
 from generator.calc import PresetType
 
+if TYPE_CHECKING:
+    from generator.preset.preview import Layout
+
 
 @dataclass
 class InputValue:
@@ -20,11 +23,28 @@ class InputValue:
             self.value = float(value)
 
 
+class PresetRecord(NamedTuple):
+    preset_type: PresetType
+    name: str
+    text: str
+
+
+class PresetSink(Protocol):
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
 class PresetGenerator(Protocol):
     def setup(self, settings: dict) -> None:
         ...
 
-    def generator(self) -> None:
+    def presets(self) -> Iterator[PresetRecord]:
+        ...
+
+    def generate(self, sink: PresetSink = None) -> None:
         ...
 
     def inputs(self) -> list[InputValue]:
@@ -33,6 +53,12 @@ class PresetGenerator(Protocol):
     def types(self) -> list[PresetType]:
         ...
 
+    def count(self) -> int:
+        ...
+
+    def layout(self) -> "Layout":
+        ...
+
     @property
     def description(self) -> str:
         ...
@@ -1,7 +1,12 @@
+import json
+import os
+
 from collections import namedtuple
 from configparser import ConfigParser
 from pathlib import Path
+from typing import Iterable, Sequence
 
+from generator import CACHE_DIR
 from generator.preset.types import InputValue
 
 
@@ -18,6 +23,11 @@ def get_input_values(values: list[InputValue]):
     return Values(*values)
 
 
+def format_size(size: float) -> str:
+    """Size for a preset name, without decimals for a whole number"""
+    return f"{size:.0f}" if size == round(size) else f"{size:g}"
+
+
 def get_dict_values(values: list[InputValue]):
     value_dict = {value.name: value.value for value in values}
     return value_dict
@@ -28,13 +38,31 @@ def to_percent(value: int, max_value: int):
     return f"{percent:.4f}%"
 
 
-def get_output_path(setting_files: list[str]):
-    paths = [
-        Path(dst).expanduser()
-        for dst in setting_files
-        if Path(dst).expanduser().exists()
-    ]
-    paths = sorted(paths, key=lambda path: path.stat().st_mtime, reverse=True)
+def to_percents(values: Iterable[int], max_value: int) -> list[str]:
+    """Format all values like to_percent, each distinct value is only formatted once"""
+    if not isinstance(values, Sequence):
+        values = list(values)
+    formatted = {value: to_percent(value, max_value) for value in set(values)}
+    return list(map(formatted.__getitem__, values))
+
+
+def stat_mtimes(paths: Iterable[Path]) -> dict[str, int | None]:
+    """Return the mtime in ns of every path, None when it does not exist"""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path.as_posix()] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path.as_posix()] = None
+    return mtimes
+
+
+def get_output_path(setting_files: list[str], mtimes: dict[str, int | None] = None):
+    paths = [Path(dst).expanduser() for dst in setting_files]
+    if mtimes is None:
+        mtimes = stat_mtimes(paths)
+    paths = [path for path in paths if mtimes[path.as_posix()] is not None]
+    paths = sorted(paths, key=lambda path: mtimes[path.as_posix()], reverse=True)
     appdata_dir = None
     if paths:
         config_path: str = paths[0].as_posix()
@@ -55,3 +83,64 @@ def get_output_path(setting_files: list[str]):
         return appdata_dir.as_posix()
     else:
         return None
+
+
+def appdata_candidates(system: str, setting_files: list[str]) -> list[Path]:
+    """Return the paths deciding the Shotcut app data dir of a platform"""
+    match system:
+        case "linux":
+            return [Path(dst).expanduser() for dst in setting_files]
+        case "windows":
+            localappdata = os.getenv("LOCALAPPDATA")
+            if localappdata:
+                return [Path(localappdata) / Path("Meltytech") / Path("Shotcut")]
+        case "darwin":
+            return [Path("~/Library/Application Support/Meltytech/Shotcut/").expanduser()]
+    return []
+
+
+def find_appdata_dir(
+    system: str, setting_files: list[str], mtimes: dict[str, int | None] = None
+) -> str | None:
+    """Find the Shotcut app data dir without the cache"""
+    if system == "linux":
+        return get_output_path(setting_files, mtimes)
+    for path in appdata_candidates(system, setting_files):
+        if path.exists():
+            return str(path)
+    return None
+
+
+def get_appdata_dir(
+    system: str,
+    setting_files: list[str],
+    cache_file: Path = CACHE_DIR / Path("appdata.json"),
+) -> str | None:
+    """Return the Shotcut app data dir, cached until a config file changes
+
+    Only the lookup on linux reads config files, the cache is keyed on
+    their mtimes. On windows and macOS the app data dir is only checked,
+    which is as fast as a cache.
+    """
+    if system != "linux":
+        return find_appdata_dir(system, setting_files)
+    mtimes = stat_mtimes(appdata_candidates(system, setting_files))
+    key = {"system": system, "mtimes": mtimes}
+    try:
+        cached = json.loads(cache_file.read_text())
+        path = cached["appdata_dir"]
+        if cached["key"] == key and (path is None or Path(path).is_dir()):
+            if path:
+                print(f" --> Shotcut app data dir (cached): {path}")
+            return path
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    path = find_appdata_dir(system, setting_files, mtimes)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps({"key": key, "appdata_dir": path}))
+        tmp_file.replace(cache_file)
+    except OSError as e:
+        print(f"Could not cache app data dir : {e}")
+    return path
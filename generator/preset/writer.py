@@ -0,0 +1,204 @@
+"""Writer for preset files shared by all generators."""
+
+import locale
+import os
+import time
+import urllib.parse
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+
+from generator.calc import PresetType
+from generator.preset.manifest import Manifest, content_hash
+from generator.preset.report import current, stage
+
+
+class PresetWriteError(Exception):
+    """Raised when presets could not be written by the threaded writer"""
+
+    def __init__(self, errors: list[tuple[str, OSError]]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return f"{len(self.errors)} presets could not be written"
+
+
+def file_bytes(preset: str) -> bytes:
+    """The bytes of a preset file, with the newlines and encoding of text mode"""
+    return preset.replace("\n", os.linesep).encode(locale.getpreferredencoding(False))
+
+
+def write_file(path: str, preset: str) -> int:
+    """Write a preset file like text mode, return the number of bytes written"""
+    data = file_bytes(preset)
+    with open(path, "wb") as out_file:
+        return out_file.write(data)
+
+
+class LogMode(StrEnum):
+    VERBOSE = "verbose"
+    SUMMARY = "summary"
+    QUIET = "quiet"
+
+
+@dataclass
+class PresetWriter:
+    """Write presets to <output>/presets/<PresetType>/<quoted name>
+
+    Directories are created once per run, and the presets are buffered
+    in memory and written when the buffer is full or the writer is closed.
+    With incremental writing, presets whose content hash matches the
+    manifest of the previous run are not written again.
+
+    With threads, every file is submitted to a thread pool as soon as it
+    is written, so rendering overlaps with slow storage. At most
+    max_pending writes are in flight, further presets wait for the oldest
+    write. Failed writes are logged per file and raised together as
+    PresetWriteError on close, unless the writer is left by another
+    exception.
+    """
+
+    output: str
+    log: LogMode = LogMode.VERBOSE
+    buffer_size: int = 256 * 1024
+    incremental: bool = True
+    save_manifest: bool = True
+    threads: int = 0
+    max_pending: int = 256
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    directories: int = 0
+    errors: list[tuple[str, OSError]] = field(default_factory=list)
+    _directories: dict[PresetType, str] = field(default_factory=dict, repr=False)
+    _buffer: list[tuple[str, str, str, str, str]] = field(
+        default_factory=list, repr=False
+    )
+    _buffered: int = 0
+    _manifest: Manifest = field(default=None, repr=False)
+    _executor: ThreadPoolExecutor = field(default=None, repr=False)
+    _pending: deque[tuple[str, str, str, Future]] = field(
+        default_factory=deque, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self._manifest = Manifest.load(self.output)
+        if self.threads > 0:
+            self._executor = ThreadPoolExecutor(
+                self.threads, thread_name_prefix="PresetWriter"
+            )
+
+    def __enter__(self) -> "PresetWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        try:
+            self.close()
+        except PresetWriteError:
+            # the failed writes were logged, do not hide the original error
+            if exc_type is None:
+                raise
+
+    @property
+    def manifest(self) -> Manifest:
+        return self._manifest
+
+    def directory(self, preset_type: PresetType) -> str:
+        """Return the directory for a preset type, create it on first use"""
+        try:
+            return self._directories[preset_type]
+        except KeyError:
+            directory = (
+                Path(self.output).expanduser() / Path("presets") / Path(preset_type)
+            ).resolve()
+            try:
+                directory.mkdir(parents=True)
+                self.directories += 1
+            except FileExistsError:
+                pass
+            self._directories[preset_type] = directory.as_posix()
+            return self._directories[preset_type]
+
+    def write(self, preset_type: PresetType, name: str, preset: str) -> None:
+        """Add a preset to the buffer"""
+        report = current()
+        if report:
+            start = time.perf_counter()
+            qf_name = urllib.parse.quote_plus(name)
+            report.add("quote", time.perf_counter() - start)
+        else:
+            qf_name = urllib.parse.quote_plus(name)
+        path = os.path.join(self.directory(preset_type), qf_name)
+        key = f"presets/{preset_type}/{qf_name}"
+        digest = content_hash(preset)
+        if (
+            self.incremental
+            and self._manifest.unchanged(key, digest)
+            and os.path.exists(path)
+        ):
+            self.skipped += 1
+            return
+        if self._executor:
+            self.submit(name, path, preset, key, digest)
+            return
+        self._buffer.append((name, path, preset, key, digest))
+        self._buffered += len(preset)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered presets to disk"""
+        verbose = self.log == LogMode.VERBOSE
+        for name, path, preset, key, digest in self._buffer:
+            if verbose:
+                print(f"create preset {name} : {path}")
+            self.bytes += write_file(path, preset)
+            self._manifest.update(key, digest)
+            self.files += 1
+        self._buffer.clear()
+        self._buffered = 0
+
+    def submit(self, name: str, path: str, preset: str, key: str, digest: str) -> None:
+        """Start a threaded write, wait for the oldest if too many are pending"""
+        if self.log == LogMode.VERBOSE:
+            print(f"create preset {name} : {path}")
+        future = self._executor.submit(write_file, path, preset)
+        self._pending.append((path, key, digest, future))
+        while len(self._pending) > self.max_pending:
+            self.complete(*self._pending.popleft())
+
+    def complete(self, path: str, key: str, digest: str, future: Future) -> None:
+        """Wait for a threaded write and record the result"""
+        try:
+            self.bytes += future.result()
+        except OSError as e:
+            print(f"could not write preset {path} : {e}")
+            self.errors.append((path, e))
+            return
+        self._manifest.update(key, digest)
+        self.files += 1
+
+    def close(self) -> None:
+        with stage("write"):
+            self.flush()
+            while self._pending:
+                self.complete(*self._pending.popleft())
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+            if self.save_manifest:
+                self._manifest.save()
+        if report := current():
+            report.count_output(self.files, self.bytes, self.directories)
+        if self.log == LogMode.SUMMARY:
+            directories = ", ".join(self._directories.values())
+            print(
+                f"created {self.files} presets ({self.bytes} bytes), "
+                f"{self.skipped} unchanged in {directories}"
+            )
+        if self.errors:
+            raise PresetWriteError(self.errors)
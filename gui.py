@@ -1,17 +1,24 @@
 import sys
 
-from PyQt6.QtWidgets import QApplication
+from generator.gui.startup import StartupTimer
 
-from generator.gui.window import MainWindow
-from generator.preset import load_presets
+startup = StartupTimer()
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from generator.gui.window import MainWindow  # noqa: E402
+from generator.preset import load_presets  # noqa: E402
 
 if __name__ == "__main__":
+    startup.mark("imports")
     presets, settings = load_presets()
+    startup.mark("load presets")
     # Qt application setup
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
-    win = MainWindow()
+    win = MainWindow(startup)
     win.setup(settings)
     win.add_presets(presets)
+    startup.mark("main window")
     win.show()
     sys.exit(app.exec())
@@ -0,0 +1,24 @@
+from bench.benchmarks import get_benchmarks
+from bench.runner import Result, compare, measure
+
+
+def test_measure():
+    result = measure("grid_2x2", get_benchmarks()["grid_2x2"], repeat=1)
+    assert result.presets == 9
+    assert result.bytes > 0
+    assert result.peak_memory > 0
+
+
+def test_compare():
+    baseline = {
+        "fast": {"presets": 100, "seconds": 1.0},
+        "slow": {"presets": 100, "seconds": 1.0},
+        "instant": {"presets": 100, "seconds": 0.0},
+    }
+    results = [
+        Result("fast", 100, 0, 0.9, 0),
+        Result("slow", 100, 0, 2.0, 0),
+        Result("new", 100, 0, 1.0, 0),
+        Result("instant", 100, 0, 1.0, 0),
+    ]
+    assert compare(results, baseline, 0.25) == ["slow"]
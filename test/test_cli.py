@@ -0,0 +1,115 @@
+import json
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from generator.cli import TaskOptions, apply_overrides, get_tasks, main, run_tasks, shard_tasks
+from generator.plugins.grid import GridPreset
+from generator.plugins.pip import PipPreset
+from generator.preset.manifest import MANIFEST_NAME
+from generator.preset.writer import LogMode
+
+
+@pytest.fixture
+def presets() -> list:
+    grid = GridPreset(name="Grid")
+    pip = PipPreset(name="Pip", width=3840, height=2160, size=50.0, padding=32)
+    grid.inputs()
+    pip.inputs()
+    return [grid, pip]
+
+
+def test_no_qt():
+    # a fresh interpreter, the test process may have imported Qt for other tests
+    code = (
+        "import sys, generator.cli; "
+        "generator.cli.main(['--list']); "
+        "print(sorted(name for name in sys.modules if name.startswith('PyQt6')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+def test_apply_overrides(presets):
+    apply_overrides(presets, ["Grid.rows=4", "size=25"])
+    assert presets[0].inputs()[0].value == 4
+    assert presets[1].inputs()[0].value == 25.0
+
+
+def test_apply_overrides_unknown(presets):
+    with pytest.raises(ValueError):
+        apply_overrides(presets, ["Grid.size=4"])
+    with pytest.raises(ValueError):
+        apply_overrides(presets, ["rows"])
+
+
+def test_get_tasks(presets):
+    assert len(get_tasks(presets, None, None)) == 4
+    assert len(get_tasks(presets, ["Pip"], None)) == 3
+    assert len(get_tasks(presets, None, ["cropRectangle"])) == 2
+    with pytest.raises(ValueError):
+        get_tasks(presets, ["Unknown"], None)
+
+
+def test_shard_tasks(presets):
+    tasks = shard_tasks(get_tasks(presets, None, None), 2)
+    grid_tasks = [preset for preset, _ in tasks if preset.name == "Grid"]
+    assert len(grid_tasks) > 1
+    assert sorted(cell for shard in grid_tasks for cell in shard.cells) == list(range(9))
+    assert len(shard_tasks(get_tasks(presets, None, None), 2, TaskOptions(profile="p"))) == 4
+
+
+def test_run_tasks_sharded(tmp_path: Path, presets):
+    for preset in presets:
+        preset.output = tmp_path.as_posix()
+        preset.log = LogMode.QUIET
+    results = run_tasks(get_tasks(presets, ["Grid"], None), tmp_path.as_posix(), 2)
+    assert [(result.name, result.files) for result in results] == [("Grid", 36)]
+    assert len(list((tmp_path / "presets/cropRectangle").iterdir())) == 36
+    with open(tmp_path / MANIFEST_NAME) as file:
+        assert len(json.load(file)) == 36
+
+
+def test_main(tmp_path: Path):
+    args = ["-o", tmp_path.as_posix(), "-j", "1", "--log", "quiet", "-s", "Grid.rows=2"]
+    assert main(args + ["-s", "Grid.columns=2"]) == 0
+    # 2x2 grid, 8 slidein and 4 crop pip presets
+    assert len(list((tmp_path / "presets/cropRectangle").iterdir())) == 9 + 8 + 4
+    assert len(list((tmp_path / "presets/maskSimpleShape").iterdir())) == 4
+    with open(tmp_path / MANIFEST_NAME) as file:
+        assert len(json.load(file)) == 9 + 8 + 4 * 3
+
+
+def test_main_archive(tmp_path: Path):
+    archive = tmp_path / "presets.zip"
+    assert main(["-o", archive.as_posix(), "--only", "Pip", "--log", "quiet"]) == 0
+    with zipfile.ZipFile(archive) as file:
+        assert len(file.namelist()) == 12
+
+
+def test_main_error(tmp_path: Path):
+    assert main(["-o", tmp_path.as_posix(), "--only", "Unknown"]) == 2
+
+
+def test_main_sweep(tmp_path: Path):
+    args = ["-o", tmp_path.as_posix(), "-j", "1", "--log", "quiet", "--only", "Pip"]
+    assert main(args + ["-t", "cropRectangle", "--sweep", "size=10:30:10"]) == 0
+    assert len(list((tmp_path / "presets/cropRectangle").iterdir())) == 3 * 4
+
+
+def test_main_dry_run(tmp_path: Path, capsys):
+    args = ["-o", tmp_path.as_posix(), "-j", "1", "--only", "Pip", "-t", "cropRectangle"]
+    assert main(args + ["--log", "quiet"]) == 0
+    assert main(args + ["--dry-run", "-s", "Pip.size=25"]) == 0
+    out = capsys.readouterr().out
+    assert "Dry run: 4 added (316 bytes), 0 changed (0 bytes), 0 unchanged" in out
+    assert "4 stale" in out
@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+
+from generator.calc import PresetType
+from generator.preset.diff import DiffSink
+from generator.preset.manifest import MANIFEST_NAME
+from generator.preset.writer import LogMode, PresetWriter
+
+CROP = PresetType.CROP_RECTANGLE
+
+
+def write(output: Path, presets: dict[str, str]) -> None:
+    with PresetWriter(output.as_posix(), LogMode.QUIET) as writer:
+        for name, text in presets.items():
+            writer.write(CROP, name, text)
+
+
+def test_diff(tmp_path: Path):
+    write(tmp_path, {"Pip_same": "1", "Pip_size": "1", "Pip_content": "1", "Pip_stale": "12"})
+    before = sorted(path.name for path in tmp_path.rglob("*"))
+    with DiffSink(tmp_path.as_posix()) as diff:
+        diff.write(CROP, "Pip_same", "1")
+        diff.write(CROP, "Pip_size", "22")
+        diff.write(CROP, "Pip_content", "2")
+        diff.write(CROP, "Pip_new", "333")
+    assert diff.counts == {"added": 1, "changed": 2, "unchanged": 1, "stale": 1}
+    assert diff.bytes == {"added": 3, "changed": 3, "unchanged": 1, "stale": 2}
+    assert diff.names["stale"] == ["presets/cropRectangle/Pip_stale"]
+    # nothing was written
+    assert sorted(path.name for path in tmp_path.rglob("*")) == before
+
+
+def test_diff_without_manifest(tmp_path: Path):
+    write(tmp_path, {"same": "1", "content": "1"})
+    (tmp_path / MANIFEST_NAME).unlink()
+    with DiffSink(tmp_path.as_posix()) as diff:
+        diff.write(CROP, "same", "1")
+        diff.write(CROP, "content", "2")
+    assert diff.counts == {"added": 0, "changed": 1, "unchanged": 1, "stale": 0}
+
+
+def test_diff_empty_output(tmp_path: Path):
+    with DiffSink((tmp_path / "missing").as_posix()) as diff:
+        diff.write(CROP, "new", "1")
+    assert diff.counts["added"] == 1
+    assert not (tmp_path / "missing").exists()
+
+
+def test_diff_stale_only_own_presets(tmp_path: Path):
+    write(tmp_path, {"Pip_old": "1", "4K_Pip_old": "1", "Grid_old": "1"})
+    (tmp_path / "presets/cropRectangle/Pip_user").write_text("1")
+    with DiffSink(tmp_path.as_posix()) as diff:
+        diff.write(CROP, "Pip_new", "1")
+    assert sorted(diff.names["stale"]) == [
+        "presets/cropRectangle/4K_Pip_old",
+        "presets/cropRectangle/Pip_old",
+    ]
+
+
+def test_diff_text_mode(tmp_path: Path, monkeypatch):
+    # the writer translates the newlines, like text mode on Windows
+    monkeypatch.setattr(os, "linesep", "\r\n")
+    (tmp_path / "presets/cropRectangle").mkdir(parents=True)
+    (tmp_path / "presets/cropRectangle/Pip_a").write_bytes(b"1\r\n2")
+    with DiffSink(tmp_path.as_posix()) as diff:
+        diff.write(CROP, "Pip_a", "1\n2")
+    assert diff.counts["unchanged"] == 1
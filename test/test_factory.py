@@ -0,0 +1,95 @@
+import pickle
+import sys
+from collections import namedtuple
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from generator.plugins.pip import PipPreset
+from generator.preset import factory, loader
+
+PLUGIN = """
+from dataclasses import dataclass
+
+from generator.preset import factory
+
+
+@dataclass
+class ExamplePreset:
+    name: str
+    size: int = 1
+    output: str = None
+    description: str = ""
+
+    def setup(self, settings) -> None:
+        self.output = settings.output
+
+
+def register() -> None:
+    factory.register("example", ExamplePreset)
+"""
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    (tmp_path / "example_plugin.py").write_text(PLUGIN)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(loader, "plugin_modules", {})
+    yield "example_plugin"
+    factory.unregister("example")
+    sys.modules.pop("example_plugin", None)
+
+
+def test_lazy_import(plugin):
+    loader.load_plugins({"example": plugin})
+    preset = factory.create_lazy(
+        {"type": "example", "name": "Example", "description": "Example", "size": 4}
+    )
+    preset.setup(namedtuple("Settings", "output")("./out"))
+    assert preset.name == "Example"
+    assert preset.description == "Example"
+    assert plugin not in sys.modules
+    assert not preset.loaded
+    assert preset.size == 4
+    assert plugin in sys.modules
+    assert preset.loaded
+    assert preset.output == "./out"
+    assert preset.generator.description == "Example"
+    preset.size = 8
+    assert preset.generator.size == 8
+
+
+def test_create_imports_plugin(plugin):
+    loader.load_plugins({"example": plugin})
+    preset = factory.create({"type": "example", "name": "Example", "description": "Example"})
+    assert preset.name == "Example"
+    assert plugin in sys.modules
+
+
+def test_unknown_type(plugin):
+    with pytest.raises(ValueError, match="unknown"):
+        factory.create({"type": "missing", "name": "Missing"})
+
+
+def test_plugin_not_registering(plugin):
+    loader.load_plugins({"other": plugin})
+    with pytest.raises(ValueError, match="does not register"):
+        factory.create({"type": "other", "name": "Other"})
+
+
+def test_discover_plugins(plugin, monkeypatch):
+    entry_point = EntryPoint("example", plugin, loader.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(loader, "entry_points", lambda group: [entry_point])
+    loader.discover_plugins()
+    assert loader.plugin_modules == {"example": plugin}
+    assert plugin not in sys.modules
+
+
+def test_pickle_lazy_generator(monkeypatch):
+    monkeypatch.setitem(factory.preset_creation_funcs, "pip", PipPreset)
+    preset = factory.create_lazy(
+        {"type": "pip", "name": "Pip", "width": 3840, "height": 2160, "size": 50, "padding": 32}
+    )
+    copy = pickle.loads(pickle.dumps(preset))
+    assert isinstance(copy, PipPreset)
+    assert copy.size == 50
@@ -0,0 +1,49 @@
+import pytest
+
+from generator.calc import CORNER, BlockCalc, GridCalculator
+from generator.calc.fixed import axis_lines, div_round, halves, to_fixed
+
+
+@pytest.mark.parametrize(
+    "numerator,denominator,expected",
+    [(5, 2, 2), (7, 2, 4), (-5, 2, -2), (-7, 2, -4), (10, 4, 2), (11, 4, 3), (9, 4, 2)],
+)
+def test_div_round(numerator, denominator, expected):
+    assert div_round(numerator, denominator) == expected == round(numerator / denominator)
+
+
+def test_to_fixed():
+    assert to_fixed(50.0) == 50_000_000
+    assert to_fixed(33.3) == 33_300_000
+    assert to_fixed(0.1, 10) == 1
+
+
+def test_halves():
+    assert halves(1.5) == 3
+    assert halves(-0.5) == -1
+    with pytest.raises(ValueError):
+        halves(0.3)
+
+
+def test_axis_lines():
+    starts, ends = axis_lines(3, 3840, 32)
+    assert starts == (16, 1296, 2576)
+    assert ends == (0, 1280, 2560, 3824)
+    assert axis_lines(3, 3840, 32, border=False) == ((0, 1280, 2560), (0, 1280, 2560, 3840))
+
+
+def test_grid_edges_do_not_drift():
+    # 3840 / 7 is not a whole number of pixels, the last span still ends at the border
+    calc = GridCalculator(1, 7)
+    x, _, width, _ = calc.calc_block(0, 6, 1, 1)
+    assert x + width == 3840 - 16
+    x, _, width, _ = calc.calc_block(0, 0, 1, 7)
+    assert (x, width) == (16, 3840 - 32)
+
+
+def test_block_calc_helpers_match_blocks():
+    calc = BlockCalc(33.3)
+    x, y, width, height = calc.calc_block(CORNER)
+    assert (calc.prefix_x, calc.prefix_y) == calc.position(CORNER) == (x, y)
+    assert (calc.block_width, calc.block_height) == (width, height)
+    assert x + width == 3840
@@ -4,20 +4,13 @@ from generator.plugins.grid import GridPreset
 
 
 @pytest.fixture
-def grid_res(monkeypatch):
-    res = []
-
-    def write_preset(self, name: str, preset: str):
-        res.append((name, preset))
-
-    monkeypatch.setattr(GridPreset, "write_preset", write_preset)
+def grid_res():
     grid = GridPreset(name="grid")
     inputs = grid.inputs()
     # 2x2 Grid
     inputs[0].value = 2  # rows
     inputs[1].value = 2  # columns
-    grid.generate()
-    return res
+    return [(record.name, record.text) for record in grid.presets()]
 
 
 def test_grid_11_11(grid_res):
@@ -70,3 +63,38 @@ def test_grid_22_11(grid_res):
     # P_width = (width/cols-padding)/width*100 = (3840/2-32)/3840*100 ≈ 49,1667
     # p_height = (height/rows-padding)/height*100 = (2160/2-32)/2160*100 ≈ 48,5185
     assert preset[1] == "rect: 50.4167% 50.7407% 49.1667% 48.5185% 1"
+
+
+def test_grid_frame_size():
+    grid = GridPreset(name="grid", width=1080, height=1920)
+    inputs = grid.inputs()
+    inputs[0].value = 1  # rows
+    inputs[1].value = 1  # columns
+    record = next(grid.presets())
+    # p_x = (padding/2)/width*100 = 16/1080*100 ≈ 1.4815
+    # p_width = (width-padding)/width*100 = 1048/1080*100 ≈ 97.0370
+    assert record.text.split("\n")[1] == "rect: 1.4815% 0.8333% 97.0370% 98.3333% 1"
+
+
+@pytest.mark.parametrize("rows,columns", [(1, 1), (2, 3), (5, 4)])
+def test_grid_count(rows, columns):
+    grid = GridPreset(name="grid")
+    inputs = grid.inputs()
+    inputs[0].value = rows
+    inputs[1].value = columns
+    assert grid.count() == len(list(grid.presets()))
+
+
+def test_grid_constraints():
+    grid = GridPreset(name="grid", spans="2x2")
+    inputs = {value.name: value for value in grid.inputs()}
+    inputs["rows"].value = 3
+    inputs["columns"].value = 3
+    names = [record.name for record in grid.presets()]
+    assert names == [
+        "Grid_3x3_(1,1.2x2)",
+        "Grid_3x3_(1,2.2x2)",
+        "Grid_3x3_(2,1.2x2)",
+        "Grid_3x3_(2,2.2x2)",
+    ]
+    assert grid.count() == 4
@@ -1,6 +1,6 @@
 import pytest
 
-from generator.calc import GridCalculator
+from generator.calc import GridCalculator, SpanConstraints
 
 
 @pytest.fixture
@@ -8,12 +8,8 @@ def calc() -> GridCalculator:
     return GridCalculator(2, 2)
 
 
-def test_block_width(calc: GridCalculator):
-    assert calc.block_width == 1920
-
-
-def test_block_height(calc: GridCalculator):
-    assert calc.block_height == 1080
+def test_cell_size(calc: GridCalculator):
+    assert calc.calc_block(1, 1, 1, 1, border=False)[2:] == (1920, 1080)
 
 
 # TopLeft
@@ -71,3 +67,86 @@ def test_calc_no_border_bottom_right(calc: GridCalculator):
     assert y == 1080
     assert w == 1920
     assert h == 1080
+
+
+def test_calc_spans(calc: GridCalculator):
+    spans = calc.calc_spans()
+    assert len(spans) == 9
+    assert list(spans)[0] == (0, 0, 1, 1, 16, 16, 1904, 1064)
+    assert list(spans)[-1] == (1, 1, 1, 1, 1936, 1096, 1888, 1048)
+
+
+@pytest.mark.parametrize("rows,cols", [(1, 1), (3, 5), (7, 3)])
+@pytest.mark.parametrize("border", [True, False])
+def test_calc_spans_matches_calc_block(rows, cols, border):
+    calc = GridCalculator(rows, cols)
+    expected = [
+        (row, col, num_row, num_col)
+        + calc.calc_block(row, col, num_row, num_col, border=border)
+        for row in range(rows)
+        for col in range(cols)
+        for num_row in range(1, rows - row + 1)
+        for num_col in range(1, cols - col + 1)
+    ]
+    assert list(calc.calc_spans(border=border)) == expected
+
+
+@pytest.mark.parametrize(
+    "constraints",
+    [
+        SpanConstraints(),
+        SpanConstraints(max_rows=2, max_columns=1),
+        SpanConstraints(edge_only=True),
+        SpanConstraints.parse(aspect="16:9,2:1"),
+        SpanConstraints.parse(spans="1x1,2x3"),
+        SpanConstraints.parse(max_rows=3, aspect="16:9", edge_only=1),
+    ],
+)
+def test_calc_spans_constraints(constraints):
+    calc = GridCalculator(4, 6)
+    expected = [
+        span
+        for span in calc.calc_spans()
+        if (not constraints.max_rows or span[2] <= constraints.max_rows)
+        and (not constraints.max_columns or span[3] <= constraints.max_columns)
+        and constraints.allows(calc, span[0], span[2], span[1], span[3])
+    ]
+    spans = list(calc.calc_spans(constraints=constraints))
+    assert spans == expected
+    assert calc.count_spans(constraints) == len(spans)
+
+
+def test_constraints_prune():
+    calc = GridCalculator(10, 10)
+    assert len(calc.calc_spans()) == 3025
+    assert len(calc.calc_spans(constraints=SpanConstraints.parse(spans="1x1"))) == 100
+    edge = calc.calc_spans(constraints=SpanConstraints(edge_only=True))
+    assert all(
+        row == 0 or col == 0 or row + num_row == 10 or col + num_col == 10
+        for row, col, num_row, num_col, *_ in edge
+    )
+    square = calc.calc_spans(constraints=SpanConstraints.parse(aspect="16:9"))
+    assert all(num_row == num_col for _, _, num_row, num_col, *_ in square)
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [{"aspect": "16:x"}, {"aspect": "1:0"}, {"spans": "2by2"}, {"max_rows": -1}],
+)
+def test_constraints_parse_invalid(arguments):
+    with pytest.raises(ValueError):
+        SpanConstraints.parse(**arguments)
+
+
+@pytest.mark.parametrize("constraints", [None, SpanConstraints.parse(edge_only=1)])
+def test_calc_spans_cells(constraints):
+    calc = GridCalculator(4, 5)
+    spans = list(calc.calc_spans(constraints=constraints))
+    shards = [range(0, 3), range(3, 11), range(11, 20)]
+    sharded = [
+        span for cells in shards for span in calc.calc_spans(constraints=constraints, cells=cells)
+    ]
+    assert sharded == spans
+    assert [calc.count_spans(constraints, cells) for cells in shards] == [
+        len(calc.calc_spans(constraints=constraints, cells=cells)) for cells in shards
+    ]
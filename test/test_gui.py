@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from generator.gui import ui  # noqa: E402
+from generator.plugins.grid import GridPreset  # noqa: E402
+from generator.preset.writer import LogMode  # noqa: E402
+
+UI_FILE = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Form</class>
+ <widget class="QWidget" name="Form">
+  <widget class="QLabel" name="label"/>
+ </widget>
+</ui>
+"""
+
+
+@pytest.fixture
+def ui_file(tmp_path: Path) -> Path:
+    path = tmp_path / "form.ui"
+    path.write_text(UI_FILE)
+    return path
+
+
+@pytest.fixture
+def compiles(monkeypatch) -> list[str]:
+    calls = []
+    compile_ui = ui.uic.compileUi
+
+    def counting(path, out):
+        calls.append(path)
+        compile_ui(path, out)
+
+    monkeypatch.setattr(ui.uic, "compileUi", counting)
+    return calls
+
+
+def test_compiled_ui_cache(tmp_path: Path, ui_file: Path, compiles: list[str]):
+    cache_dir = tmp_path / "cache"
+    code = ui.compiled_ui(ui_file, cache_dir)
+    assert "class Ui_Form" in code
+    assert ui.compiled_ui(ui_file, cache_dir) == code
+    assert len(compiles) == 1
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_compiled_ui_invalidated(
+    tmp_path: Path, ui_file: Path, compiles: list[str], monkeypatch
+):
+    cache_dir = tmp_path / "cache"
+    ui.compiled_ui(ui_file, cache_dir)
+    monkeypatch.setattr(ui, "PYQT_VERSION_STR", "0.0.1")
+    ui.compiled_ui(ui_file, cache_dir)
+    assert len(compiles) == 2
+    ui_file.write_text(UI_FILE.replace("label", "text"))
+    assert "self.text" in ui.compiled_ui(ui_file, cache_dir)
+    assert len(compiles) == 3
+    # the files compiled for other versions or contents are removed
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def run_worker(preset) -> dict[str, list]:
+    from generator.gui.worker import GenerateWorker
+
+    worker = GenerateWorker(preset)
+    signals = {"generated": [], "failed": [], "cancelled": []}
+    worker.generated.connect(signals["generated"].append)
+    worker.failed.connect(signals["failed"].append)
+    worker.cancelled.connect(signals["cancelled"].append)
+    # run in this thread, the signals are delivered directly
+    worker.run()
+    return signals
+
+
+def test_worker_generates(tmp_path: Path):
+    preset = GridPreset(name="Grid", output=tmp_path.as_posix(), log=LogMode.QUIET)
+    signals = run_worker(preset)
+    assert len(signals["generated"]) == 1
+    assert not signals["failed"]
+
+
+@pytest.mark.parametrize(
+    "inputs", [{"profiles": "720p"}, {"rows": 0}], ids=["unknown_profile", "zero_rows"]
+)
+def test_worker_fails(tmp_path: Path, inputs: dict):
+    preset = GridPreset(name="Grid", output=tmp_path.as_posix(), log=LogMode.QUIET)
+    for value in preset.inputs():
+        if value.name in inputs:
+            value.value = inputs[value.name]
+    signals = run_worker(preset)
+    assert len(signals["failed"]) == 1
+    assert not signals["generated"]
+
+
+def test_generate_invalid_input(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    monkeypatch.setenv("XDG_CACHE_HOME", (tmp_path / "cache").as_posix())
+    from PyQt6.QtWidgets import QApplication
+
+    from generator.gui.window import MainWindow
+    from generator.preset import load_presets
+
+    presets, settings = load_presets()
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    window = MainWindow()
+    window.setup(settings._replace(output=tmp_path.as_posix()))
+    window.add_presets(presets)
+    window.ui[0].setText("abc")
+    window.on_generate_clicked()
+    assert window.worker is None
+    assert "invalid value 'abc'" in window.lbl_message.text()
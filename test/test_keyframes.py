@@ -0,0 +1,86 @@
+import pytest
+
+from generator.plugins.slidein import SlideInPreset
+from generator.preset.keyframes import (
+    EASINGS,
+    Keyframe,
+    animate,
+    format_keyframes,
+    reduce,
+    sample,
+)
+
+KEYFRAMES = [
+    Keyframe(0, (0.0, 100.0)),
+    Keyframe(10, (50.0, 0.0)),
+    Keyframe(20, (50.0, 0.0)),
+    Keyframe(30, (0.0, 100.0)),
+]
+
+
+@pytest.mark.parametrize("easing", sorted(EASINGS))
+def test_easing_ends(easing):
+    assert EASINGS[easing](0.0) == 0.0
+    assert EASINGS[easing](1.0) == 1.0
+
+
+def test_sample():
+    columns = sample(KEYFRAMES)
+    assert len(columns) == 2
+    assert len(columns[0]) == 31
+    assert columns[0][5] == 25.0
+    assert columns[1][25] == 50.0
+
+
+def test_animate_linear():
+    assert animate(KEYFRAMES) == KEYFRAMES
+
+
+def test_animate_drops_collinear():
+    keyframes = [Keyframe(0, (0.0,)), Keyframe(5, (5.0,)), Keyframe(10, (10.0,))]
+    assert animate(keyframes) == [keyframes[0], keyframes[2]]
+
+
+@pytest.mark.parametrize("tolerance", [0.1, 0.5, 2.0])
+def test_animate_eased_within_tolerance(tolerance):
+    columns = sample(KEYFRAMES, "ease_out")
+    keyframes = reduce(columns, tolerance)
+    assert keyframes[0] == KEYFRAMES[0]
+    assert keyframes[-1] == KEYFRAMES[-1]
+    assert len(keyframes) < len(columns[0])
+    linear = sample(keyframes)
+    for eased, reduced in zip(columns, linear):
+        assert max(abs(a - b) for a, b in zip(eased, reduced)) <= tolerance
+
+
+def test_animate_unordered():
+    keyframes = [Keyframe(0, (0.0,)), Keyframe(29, (1.0,)), Keyframe(0, (1.0,))]
+    assert animate(keyframes) == keyframes
+
+
+def test_unknown_easing():
+    with pytest.raises(ValueError):
+        animate(KEYFRAMES, "bounce")
+
+
+def test_format_keyframes():
+    text = format_keyframes(KEYFRAMES[:2], lambda values: " ".join(f"{v:g}" for v in values))
+    assert text == "0=0 100;10=50 0"
+
+
+def test_slidein_linear_keyframes():
+    slidein = SlideInPreset("SlideIn", 3840, 2160, 50, 30, 5, 32)
+    slidein.inputs()
+    record = next(slidein.presets())
+    assert record.text.split("\n")[1:3] == [
+        "rect: 0=0.4167% 0.7407% 0 0 1;29=0.4167% 0.7407% 49.3750% 48.8889% 1;"
+        "120=0.4167% 0.7407% 49.3750% 48.8889% 1;149=0.4167% 0.7407% 0 0 1",
+        "radius: 0=0;29=0;120=0;149=0",
+    ]
+
+
+def test_slidein_eased():
+    slidein = SlideInPreset("SlideIn", 3840, 2160, 50, 30, 5, 32, easing="ease_out")
+    slidein.inputs()
+    rect = next(slidein.presets()).text.split("\n")[1]
+    assert 4 < rect.count("=") < 150
@@ -1,5 +1,4 @@
 import pytest
-from pytest import MonkeyPatch
 from generator.calc import PresetType
 
 from generator.plugins.pip import PipPreset
@@ -13,15 +12,9 @@ def pip() -> PipPreset:
     return pip
 
 
-def test_pip_crop(monkeypatch: MonkeyPatch, pip: PipPreset) -> None:
-    res = []
-
-    def write_preset(self, name: str, preset: str) -> None:
-        res.append((name, preset))
-
-    monkeypatch.setattr(PipPreset, "write_preset", write_preset)
+def test_pip_crop(pip: PipPreset) -> None:
     pip.active_type = PresetType.CROP_RECTANGLE
-    pip.generate()
+    res = [(record.name, record.text) for record in pip.presets()]
     assert len(res) == 4
     name, preset = res[0]
     assert name == "Pip_TopLeft_50%_Border"
@@ -39,3 +32,9 @@ def test_pip_crop(monkeypatch: MonkeyPatch, pip: PipPreset) -> None:
     assert name == "Pip_BottomRight_50%_Border"
     rect: str = preset.split("\n")[1]
     assert rect == "rect: 50.2083% 50.3704% 49.3750% 48.5185% 1"
+
+
+def test_pip_count(pip: PipPreset) -> None:
+    for preset_type in pip.types():
+        pip.active_type = preset_type
+        assert pip.count() == len(list(pip.presets()))
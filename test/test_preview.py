@@ -0,0 +1,51 @@
+import pytest
+
+from generator.calc import GridCalculator, PresetType, corner_blocks
+from generator.plugins.grid import GridPreset
+from generator.plugins.pip import PipPreset
+from generator.preset.preview import corner_layout, grid_layout
+
+
+def test_grid_layout():
+    layout = grid_layout(2, 3, 3840, 2160)
+    grid = GridCalculator(2, 3)
+    assert (layout.width, layout.height) == (3840, 2160)
+    assert len(layout.rects) == 6
+    assert layout.rects[0] == grid.calc_block(0, 0, 1, 1)
+    assert layout.rects[-1] == grid.calc_block(1, 2, 1, 1)
+
+
+def test_layout_cached():
+    assert grid_layout(4, 4, 1920, 1080) is grid_layout(4, 4, 1920, 1080)
+    assert corner_layout(25.0, "crop") is corner_layout(25.0, "crop")
+
+
+@pytest.mark.parametrize("rows,columns", [(0, 3), (3, -1)])
+def test_grid_layout_invalid(rows, columns):
+    with pytest.raises(ValueError):
+        grid_layout(rows, columns, 3840, 2160)
+
+
+def test_corner_layout_invalid():
+    with pytest.raises(ValueError):
+        corner_layout(0.0, "crop")
+
+
+def test_preset_layout():
+    grid = GridPreset(name="grid")
+    inputs = grid.inputs()
+    inputs[0].value = 3
+    assert len(grid.layout().rects) == 9
+    pip = PipPreset(name="pip", width=3840, height=2160, size=30.0, padding=32)
+    pip.inputs()
+    pip.active_type = PresetType.CROP_RECTANGLE
+    assert pip.layout().rects == tuple(corner_blocks(30.0, "crop").values())
+
+
+def test_corner_layout_frame():
+    layout = corner_layout(50.0, "crop", 1920, 1080)
+    assert layout.rects == tuple(corner_blocks(50.0, "crop", 1920, 1080).values())
+    assert all(x + w <= 1920 and y + h <= 1080 for x, y, w, h in layout.rects)
+    pip = PipPreset(name="pip", width=1080, height=1920, size=50.0, padding=32)
+    pip.inputs()
+    assert pip.layout() == corner_layout(50.0, "mask", 1080, 1920)
@@ -0,0 +1,63 @@
+import pytest
+
+from generator.plugins.grid import GridPreset
+from generator.plugins.pip import PipPreset
+from generator.plugins.slidein import SlideInPreset
+from generator.preset.profiles import PROFILES, Profile, frame_profiles, parse_profiles, profile_name
+
+
+def records(preset) -> dict[str, str]:
+    preset.inputs()
+    return {record.name: record.text for record in preset.presets()}
+
+
+def set_inputs(preset, **inputs):
+    for value in preset.inputs():
+        if value.name in inputs:
+            value.value = inputs[value.name]
+    return preset
+
+
+def test_parse_profiles():
+    assert parse_profiles("") == []
+    assert parse_profiles("1080p, Vertical") == [PROFILES["1080p"], PROFILES["Vertical"]]
+    with pytest.raises(ValueError):
+        parse_profiles("720p")
+
+
+def test_profile_name():
+    assert profile_name(PROFILES["8K"], "Pip_TopLeft") == "8K_Pip_TopLeft"
+    (frame,) = frame_profiles([], 3840, 2160)
+    assert frame == Profile("", 3840, 2160)
+    assert profile_name(frame, "Pip_TopLeft") == "Pip_TopLeft"
+
+
+def test_grid_profiles():
+    single = records(set_inputs(GridPreset(name="Grid"), rows=3, columns=2))
+    grid = set_inputs(GridPreset(name="Grid"), rows=3, columns=2, profiles="1080p,4K,Vertical")
+    presets = records(grid)
+    assert len(presets) == grid.count() == 3 * len(single)
+    assert {name[3:]: text for name, text in presets.items() if name.startswith("4K_")} == single
+    vertical = records(set_inputs(GridPreset(name="Grid", width=1080, height=1920), rows=3, columns=2))
+    assert {
+        name[9:]: text for name, text in presets.items() if name.startswith("Vertical_")
+    } == vertical
+
+
+@pytest.mark.parametrize(
+    "preset",
+    [
+        lambda: PipPreset("Pip", 3840, 2160, 50.0, 32),
+        lambda: SlideInPreset("SlideIn", 3840, 2160, 50.0, 30, 5, 32),
+    ],
+    ids=["pip", "slidein"],
+)
+def test_corner_profiles(preset):
+    single = records(preset())
+    multi = set_inputs(preset(), profiles="4K,Vertical")
+    presets = records(multi)
+    assert len(presets) == multi.count() == 2 * len(single)
+    assert {name[3:]: text for name, text in presets.items() if name.startswith("4K_")} == single
+    vertical = [text for name, text in presets.items() if name.startswith("Vertical_")]
+    assert len(vertical) == len(single)
+    assert set(vertical).isdisjoint(single.values())
@@ -0,0 +1,38 @@
+from string import Template
+
+import pytest
+
+from generator.calc import PresetType
+from generator.preset.render import Renderer, compile_presets, get_renderer
+
+TEMPLATE = """---
+rect: 0=$x $y 0 0 1;${frame}|=$x $y 1
+color: "#00000000" {literal} $$5
+..."""
+
+
+def test_render_same_as_template():
+    values = dict(x="1.0000%", y="2.0000%", frame=29, unused=1)
+    assert Renderer(TEMPLATE).render(**values) == Template(TEMPLATE).substitute(values)
+
+
+def test_fields():
+    assert Renderer(TEMPLATE).fields == ["x", "y", "frame"]
+
+
+def test_render_rows():
+    renderer = Renderer("rect: $x $y")
+    buffer = ["old"]
+    renderer.render_rows([(1, 2), (3, 4)], buffer)
+    assert buffer == ["rect: 1 2", "rect: 3 4"]
+    assert renderer.render_row((5, 6)) == "rect: 5 6"
+
+
+def test_missing_value():
+    with pytest.raises(KeyError):
+        Renderer("$x $y").render(x=1)
+
+
+def test_compile_presets():
+    renderers = compile_presets({PresetType.CROP_RECTANGLE: TEMPLATE})
+    assert renderers[PresetType.CROP_RECTANGLE] is get_renderer(TEMPLATE)
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from generator.plugins.grid import GridPreset
+from generator.preset.report import RunReport, current, stage
+from generator.preset.sinks import MemorySink
+from generator.preset.writer import LogMode
+
+
+def make_grid(tmp_path: Path) -> GridPreset:
+    grid = GridPreset(name="Grid", output=tmp_path.as_posix(), log=LogMode.QUIET)
+    inputs = grid.inputs()
+    inputs[0].value = 3  # rows
+    inputs[1].value = 2  # columns
+    return grid
+
+
+def test_stage_without_report():
+    assert current() is None
+    with stage("geometry"):
+        pass
+
+
+def test_report_generate(tmp_path: Path):
+    run_report = RunReport()
+    with run_report.generator("Grid", "cropRectangle"):
+        make_grid(tmp_path).generate()
+    assert current() is None
+    report = run_report.generators[0]
+    assert report.presets == 18
+    assert report.files == 18
+    assert report.bytes > 0
+    assert report.directories == 1
+    assert all(seconds >= 0 for seconds in report.stages.values())
+    assert report.stages["geometry"] > 0
+    assert report.stages["write"] > 0
+
+
+def test_report_save(tmp_path: Path):
+    run_report = RunReport()
+    with run_report.generator("Grid", "cropRectangle", (tmp_path / "grid.prof").as_posix()):
+        make_grid(tmp_path).generate(MemorySink())
+    run_report.save((tmp_path / "report.json").as_posix())
+    with open(tmp_path / "report.json") as file:
+        data = json.load(file)
+    assert data["totals"]["presets"] == 18
+    assert data["totals"]["files"] == 0
+    assert data["generators"][0]["name"] == "Grid"
+    assert (tmp_path / "grid.prof").exists()
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from generator.plugins.grid import GridPreset
+from generator.preset.manifest import Manifest
+from generator.preset.shards import split_weighted
+from generator.preset.writer import LogMode
+
+
+@pytest.mark.parametrize("parts", [1, 3, 8, 50])
+def test_split_weighted(parts):
+    weights = [9, 8, 7, 6, 5, 4, 3, 2, 1]
+    ranges = split_weighted(weights, parts)
+    assert [ndx for cells in ranges for ndx in cells] == list(range(len(weights)))
+    assert len(ranges) <= min(parts, len(weights))
+
+
+def make_grid(output: Path, **kwargs) -> GridPreset:
+    grid = GridPreset(name="grid", output=output.as_posix(), log=LogMode.QUIET, **kwargs)
+    inputs = grid.inputs()
+    inputs[0].value = 4
+    inputs[1].value = 3
+    return grid
+
+
+def read_tree(path: Path) -> dict[str, str]:
+    return {
+        file.relative_to(path).as_posix(): file.read_text()
+        for file in (path / "presets").rglob("*")
+        if file.is_file()
+    }
+
+
+@pytest.mark.parametrize("shard_size", [0, 1, 5])
+def test_shards_same_presets(tmp_path, shard_size):
+    grid = make_grid(tmp_path, shard_size=shard_size)
+    expected = list(grid.presets())
+    shards = grid.shards(2)
+    assert [record for shard in shards for record in shard.presets()] == expected
+    assert sum(shard.count() for shard in shards) == len(expected)
+
+
+def test_generate_sharded(tmp_path):
+    make_grid(tmp_path / "seq").generate()
+    make_grid(tmp_path / "shards", workers=2).generate()
+    assert read_tree(tmp_path / "shards") == read_tree(tmp_path / "seq")
+    assert (
+        Manifest.load(tmp_path / "shards").entries == Manifest.load(tmp_path / "seq").entries
+    )
@@ -0,0 +1,41 @@
+from multiprocessing import shared_memory
+
+import pytest
+
+from generator.calc import GridCalculator, SpanConstraints
+from generator.plugins.grid import GridPreset
+from generator.preset.shared import SpanBlock
+
+
+@pytest.mark.parametrize("constraints", [None, SpanConstraints.parse(edge_only=1)])
+def test_span_block(constraints):
+    calc = GridCalculator(4, 5)
+    with SpanBlock(calc.calc_spans(constraints=constraints)) as block:
+        with block.handle.attach() as attached:
+            assert list(attached.spans) == list(calc.calc_spans(constraints=constraints))
+            for cells in (range(0, 3), range(3, 11), range(11, 20), range(7, 7)):
+                assert list(attached.cells(cells, calc.columns)) == list(
+                    calc.calc_spans(constraints=constraints, cells=cells)
+                )
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(block.handle.name)
+
+
+def test_span_block_empty():
+    calc = GridCalculator(2, 2)
+    spans = calc.calc_spans(constraints=SpanConstraints.parse(spans="3x3"))
+    with SpanBlock(spans) as block:
+        with block.handle.attach() as attached:
+            assert len(attached.spans) == 0
+
+
+def test_shared_shards(tmp_path):
+    grid = GridPreset(name="grid", output=tmp_path.as_posix())
+    inputs = grid.inputs()
+    inputs[0].value = 4
+    inputs[1].value = 3
+    expected = list(grid.presets())
+    with grid.share_geometry() as block:
+        shards = grid.shards(2, block.handle)
+        assert all(shard.shared == block.handle for shard in shards)
+        assert [record for shard in shards for record in shard.presets()] == expected
@@ -0,0 +1,138 @@
+import io
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from generator.calc import PresetType
+from generator.plugins.pip import PipPreset
+from generator.preset.sinks import (
+    ArchiveSink,
+    GenerationCancelled,
+    MemorySink,
+    ProgressSink,
+    StdoutSink,
+    open_sink,
+    write_presets,
+)
+from generator.preset.types import PresetRecord
+from generator.preset.writer import LogMode, PresetWriter
+
+
+def make_pip() -> PipPreset:
+    pip = PipPreset(name="pip", width=3840, height=2160, size=50.0, padding=32)
+    pip.inputs()
+    pip.active_type = PresetType.CROP_RECTANGLE
+    return pip
+
+
+def test_memory_sink():
+    sink = MemorySink()
+    make_pip().generate(sink)
+    assert [record.name for record in sink.records] == [
+        "Pip_TopLeft_50%_Border",
+        "Pip_TopRight_50%_Border",
+        "Pip_BottomLeft_50%_Border",
+        "Pip_BottomRight_50%_Border",
+    ]
+    assert sink.records[0].preset_type == PresetType.CROP_RECTANGLE
+
+
+def test_stdout_sink():
+    stream = io.StringIO()
+    records = [PresetRecord(PresetType.CROP_RECTANGLE, "a b", "text")]
+    assert write_presets(records, StdoutSink(stream)) == 1
+    assert stream.getvalue() == "# presets/cropRectangle/a+b\ntext\n"
+
+
+def test_generate_directory(tmp_path: Path):
+    pip = make_pip()
+    pip.output = tmp_path.as_posix()
+    pip.log = LogMode.QUIET
+    pip.generate()
+    files = sorted(path.name for path in (tmp_path / "presets/cropRectangle").iterdir())
+    assert files == sorted(
+        record.name.replace("%", "%25") for record in make_pip().presets()
+    )
+
+
+def test_generate_filtered(tmp_path: Path):
+    records = (record for record in make_pip().presets() if "Top" in record.name)
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET) as writer:
+        assert write_presets(records, writer) == 2
+
+
+@pytest.mark.parametrize("name", ["presets.zip", "presets.tar", "presets.tar.gz"])
+def test_archive_sink(tmp_path: Path, name: str):
+    pip = make_pip()
+    pip.output = (tmp_path / name).as_posix()
+    pip.log = LogMode.QUIET
+    pip.generate()
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(tmp_path / name) as archive:
+            members = archive.namelist()
+            text = archive.read(members[0]).decode()
+    else:
+        with tarfile.open(tmp_path / name) as archive:
+            members = archive.getnames()
+            text = archive.extractfile(members[0]).read().decode()
+    assert members == [
+        f"presets/cropRectangle/{record.name.replace('%', '%25')}"
+        for record in make_pip().presets()
+    ]
+    assert text == next(make_pip().presets()).text
+
+
+@pytest.mark.parametrize("name", ["presets.zip", "presets.tar", "presets.tar.gz"])
+def test_archive_sink_reproducible(tmp_path: Path, name: str, monkeypatch):
+    archives = []
+    for run in range(2):
+        path = tmp_path / str(run) / name
+        with monkeypatch.context() as patch:
+            patch.setattr(time, "time", lambda: 1_600_000_000.0 + run * 3600)
+            with ArchiveSink(path.as_posix(), LogMode.QUIET) as sink:
+                make_pip().generate(sink)
+        archives.append(path.read_bytes())
+    assert archives[0] == archives[1]
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    with ArchiveSink((tmp_path / "dated.tar").as_posix(), LogMode.QUIET) as sink:
+        make_pip().generate(sink)
+    with tarfile.open(tmp_path / "dated.tar") as archive:
+        assert {member.mtime for member in archive.getmembers()} == {1700000000}
+
+
+def test_archive_sink_not_archive(tmp_path: Path):
+    with pytest.raises(ValueError):
+        ArchiveSink((tmp_path / "presets").as_posix())
+
+
+def test_open_sink(tmp_path: Path):
+    assert isinstance(open_sink(tmp_path.as_posix()), PresetWriter)
+    with open_sink((tmp_path / "out.tgz").as_posix()) as sink:
+        assert isinstance(sink, ArchiveSink)
+
+
+def test_progress_sink():
+    calls = []
+    memory = MemorySink()
+    sink = ProgressSink(memory, lambda done, size: calls.append((done, size)), interval=3)
+    make_pip().generate(sink)
+    sink.close()
+    size = sum(len(record.text) for record in memory.records)
+    assert len(memory.records) == 4
+    assert calls == [(3, sink.bytes - len(memory.records[3].text)), (4, size)]
+
+
+def test_progress_sink_cancel(tmp_path):
+    cancel = threading.Event()
+    pip = make_pip()
+    with PresetWriter(str(tmp_path), LogMode.QUIET) as writer:
+        sink = ProgressSink(writer, lambda done, size: cancel.set(), cancel, interval=2)
+        with pytest.raises(GenerationCancelled):
+            pip.generate(sink)
+    assert sink.presets == 2
+    assert len(list((tmp_path / "presets" / PresetType.CROP_RECTANGLE).iterdir())) == 2
+    assert writer.manifest.entries
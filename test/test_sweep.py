@@ -0,0 +1,106 @@
+import pytest
+
+from generator.calc import PresetType, corner_blocks
+from generator.plugins.pip import PipPreset
+from generator.plugins.slidein import SlideInPreset
+from generator.preset.sweep import parse_values, sweep
+from generator.preset.types import InputValue, PresetRecord
+
+
+@pytest.fixture
+def slidein() -> SlideInPreset:
+    slidein = SlideInPreset(
+        name="slidein",
+        width=3840,
+        height=2160,
+        size=50.0,
+        fps=30,
+        duration=5,
+        padding=32,
+    )
+    slidein.inputs()
+    return slidein
+
+
+def test_parse_values():
+    size = InputValue("size", "Size", float)
+    fps = InputValue("fps", "FPS", int)
+    assert parse_values(fps, "24,25,30,60") == [24, 25, 30, 60]
+    assert parse_values(size, "10:20:5") == [10.0, 15.0, 20.0]
+    assert parse_values(size, "0.1:0.3:0.1") == [0.1, 0.2, 0.30000000000000004]
+    assert parse_values(fps, "30") == [30]
+    with pytest.raises(ValueError):
+        parse_values(size, "20:10:5")
+
+
+def test_sweep(slidein: SlideInPreset):
+    records = list(sweep(slidein, {"size": [25.0, 50.0], "fps": [24, 30]}))
+    assert len(records) == 2 * 2 * 8
+    assert records[0].name == "SlideIn_TopLeft_25%_24fps_5s"
+    assert records[-1].name == "SlideIn_BottomRight_B_50%_30fps_5s_Border"
+    # the input values are restored
+    assert [value.value for value in slidein.inputs()] == [50.0, 5, 30, "linear", 0.5, ""]
+
+
+def test_sweep_easing(slidein: SlideInPreset):
+    records = list(sweep(slidein, {"easing": ["linear", "ease_out"]}))
+    names = [record.name for record in records]
+    # the border presets are not eased and only yielded once
+    assert len(records) == 2 * 4 + 4
+    assert len(set(names)) == len(names)
+    assert "SlideIn_TopLeft_50%_30fps_5s" in names
+    assert "SlideIn_TopLeft_50%_30fps_5s_ease_out" in names
+    assert "SlideIn_TopLeft_B_50%_30fps_5s_Border" in names
+
+
+def test_sweep_duplicates():
+    pip = PipPreset(name="pip", width=3840, height=2160, size=50.0, padding=32)
+    pip.inputs()
+    records = list(sweep(pip, {"size": [50.0, 50.0, 25.0]}))
+    assert len(records) == 8
+
+
+def test_sweep_unknown(slidein: SlideInPreset):
+    with pytest.raises(ValueError):
+        list(sweep(slidein, {"rows": [1]}))
+
+
+def test_corner_blocks_cached():
+    corner_blocks.cache_clear()
+    corner_blocks(50.0, "crop")
+    corner_blocks(50.0, "crop")
+    assert corner_blocks.cache_info().hits == 1
+
+
+class RoundedNames:
+    """Generator naming its preset with the rounded size"""
+
+    name = "rounded"
+
+    def __init__(self) -> None:
+        self.values = [InputValue("size", "Size", float, 10.0)]
+
+    def inputs(self) -> list[InputValue]:
+        return self.values
+
+    def presets(self):
+        size = self.values[0].value
+        yield PresetRecord(PresetType.CROP_RECTANGLE, f"Size_{size:.0f}", f"size: {size}")
+
+
+def test_sweep_name_collision():
+    preset = RoundedNames()
+    with pytest.raises(ValueError, match="'Size_10' has the same name for size=10.0 and size=10.4"):
+        list(sweep(preset, {"size": [10.0, 10.4]}))
+    # the inputs are restored after the error
+    assert preset.inputs()[0].value == 10.0
+    assert len(list(sweep(preset, {"size": [10.0, 10.0, 11.0]}))) == 2
+
+
+def test_sweep_fractional_names():
+    pip = PipPreset(name="pip", width=3840, height=2160, size=50.0, padding=32)
+    pip.inputs()
+    names = [record.name for record in sweep(pip, {"size": [10.0, 10.5, 11.0]})]
+    assert len(names) == len(set(names)) == 3 * 4
+    assert "Pip_TopLeft_10.5%" in names
+    assert "Pip_TopLeft_10%" in names
@@ -1,9 +1,14 @@
+import os
+
 import pytest
+from generator.preset import utils
 from generator.preset.types import InputValue
 
 from generator.preset.utils import (
+    get_appdata_dir,
     dict_to_namedtuple,
     to_percent,
+    to_percents,
     get_input_values,
     get_dict_values,
 )
@@ -43,3 +48,55 @@ def test_get_dict_values(values: list[InputValue]):
     assert rc["size"] == 10.5
     assert rc["x"] == 10
     assert rc["label"] == "text"
+
+
+def test_to_percents():
+    values = [0, 5, 16, 1920, 16, 3824, 5]
+    assert to_percents(values, 3840) == [to_percent(value, 3840) for value in values]
+    assert to_percents(iter([5, 5]), 10) == ["50.0000%", "50.0000%"]
+    assert to_percents([], 10) == []
+
+
+@pytest.fixture
+def shotcut_conf(tmp_path) -> tuple:
+    appdata_dir = tmp_path / "appdata"
+    appdata_dir.mkdir()
+    conf = tmp_path / ".config" / "Shotcut.conf"
+    conf.parent.mkdir()
+    conf.write_text(f"[General]\nappdatadir={appdata_dir}\n")
+    return conf, appdata_dir
+
+
+def test_get_appdata_dir_cached(tmp_path, shotcut_conf, monkeypatch):
+    conf, appdata_dir = shotcut_conf
+    cache_file = tmp_path / "cache" / "appdata.json"
+    assert get_appdata_dir("linux", [str(conf)], cache_file) == appdata_dir.as_posix()
+    assert cache_file.exists()
+
+    def fail(*args):
+        raise AssertionError("config parsed again")
+
+    monkeypatch.setattr(utils, "get_output_path", fail)
+    assert get_appdata_dir("linux", [str(conf)], cache_file) == appdata_dir.as_posix()
+
+
+def test_get_appdata_dir_config_changed(tmp_path, shotcut_conf):
+    conf, appdata_dir = shotcut_conf
+    cache_file = tmp_path / "appdata.json"
+    assert get_appdata_dir("linux", [str(conf)], cache_file) == appdata_dir.as_posix()
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    conf.write_text(f"[General]\nappdatadir={other_dir}\n")
+    stat = conf.stat()
+    os.utime(conf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_appdata_dir("linux", [str(conf)], cache_file) == other_dir.as_posix()
+
+
+def test_get_appdata_dir_windows(tmp_path, monkeypatch):
+    cache_file = tmp_path / "appdata.json"
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    assert get_appdata_dir("windows", [], cache_file) is None
+    appdata_dir = tmp_path / "Meltytech" / "Shotcut"
+    appdata_dir.mkdir(parents=True)
+    assert get_appdata_dir("windows", [], cache_file) == str(appdata_dir)
+    assert not cache_file.exists()
@@ -1,6 +1,6 @@
 import pytest
 
-from generator.calc import VideoBlock, BlockType
+from generator.calc import VideoBlock, VideoBlockArray, BlockType
 
 
 @pytest.fixture
@@ -30,7 +30,7 @@ def test_add():
 
 
 def test_padding(block):
-    block.set_padding(10)
+    block = block.set_padding(10)
     assert block.x == 10
     assert block.y == 10
     assert block.width == 80
@@ -38,7 +38,7 @@ def test_padding(block):
 
 
 def test_scale(qhd: VideoBlock):
-    qhd.scale(0.5)
+    qhd = qhd.scale(0.5)
     assert qhd.x == 0
     assert qhd.y == 0
     assert qhd.width == 1920
@@ -47,7 +47,7 @@ def test_scale(qhd: VideoBlock):
 
 def test_scale_center():
     block = VideoBlock(0, 0, 200, 200)
-    block.scale(0.5, center=True)
+    block = block.scale(0.5, center=True)
     assert block.x == 50
     assert block.y == 50
     assert block.width == 100
@@ -56,16 +56,16 @@ def test_scale_center():
 
 def test_move_to_corner(qhd: VideoBlock):
     block = VideoBlock(50, 50, 200, 200)
-    block.move_to_corner(qhd, BlockType.TopLeft)
+    block = block.move_to_corner(qhd, BlockType.TopLeft)
     assert block.x == 0
     assert block.y == 0
-    block.move_to_corner(qhd, BlockType.TopRight)
+    block = block.move_to_corner(qhd, BlockType.TopRight)
     assert block.x == 3640
     assert block.y == 0
-    block.move_to_corner(qhd, BlockType.BottomLeft)
+    block = block.move_to_corner(qhd, BlockType.BottomLeft)
     assert block.x == 0
     assert block.y == 1960
-    block.move_to_corner(qhd, BlockType.BottomRight)
+    block = block.move_to_corner(qhd, BlockType.BottomRight)
     assert block.x == 3640
     assert block.y == 1960
 
@@ -98,3 +98,42 @@ def test_copy(qhd: VideoBlock):
     assert qhd.y == new_block.y
     assert qhd.width == new_block.width
     assert qhd.height == new_block.height
+
+
+def test_immutable(block: VideoBlock):
+    other = VideoBlock(10, 20, 100, 200)
+    total = block + other
+    assert block == VideoBlock(0, 0, 100, 200)
+    assert total == VideoBlock(10, 20, 200, 400)
+    assert total - other == block
+    assert block.set_padding(10) is not block
+    with pytest.raises(AttributeError):
+        block.x = 10
+    assert not hasattr(block, "__dict__")
+
+
+@pytest.fixture
+def blocks() -> VideoBlockArray:
+    return VideoBlockArray.from_blocks(
+        [VideoBlock(0, 0, 3840, 2160), VideoBlock(50, 50, 200, 201)]
+    )
+
+
+def test_array_split(blocks: VideoBlockArray):
+    tiles = blocks.split(2, 3)
+    assert len(tiles) == 12
+    expected = list(blocks[0].split(2, 3)) + list(blocks[1].split(2, 3))
+    assert list(tiles) == expected
+
+
+def test_array_operations(blocks: VideoBlockArray):
+    qhd = VideoBlock(0, 0, 3840, 2160)
+    assert list(blocks.set_padding(10)) == [block.set_padding(10) for block in blocks]
+    assert list(blocks.scale(0.5)) == [block.scale(0.5) for block in blocks]
+    assert list(blocks.scale(0.3, center=True)) == [
+        block.scale(0.3, center=True) for block in blocks
+    ]
+    for corner in BlockType:
+        assert list(blocks.move_to_corner(qhd, corner)) == [
+            block.move_to_corner(qhd, corner) for block in blocks
+        ]
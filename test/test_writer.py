@@ -0,0 +1,127 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from generator.calc import PresetType
+from generator.preset.manifest import MANIFEST_NAME
+from generator.preset.writer import LogMode, PresetWriteError, PresetWriter
+
+
+def test_write(tmp_path: Path, capsys):
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "Grid 1/1", "preset 1")
+        writer.write(PresetType.CROP_RECTANGLE, "Grid 2", "preset 2")
+        # nothing is written before the buffer is flushed
+        assert not list((tmp_path / "presets" / "cropRectangle").iterdir())
+    path = tmp_path / "presets" / "cropRectangle"
+    assert (path / "Grid+1%2F1").read_text() == "preset 1"
+    assert (path / "Grid+2").read_text() == "preset 2"
+    assert writer.files == 2
+    assert writer.bytes == 16
+    assert capsys.readouterr().out == ""
+
+
+def test_write_buffer_size(tmp_path: Path):
+    writer = PresetWriter(tmp_path.as_posix(), LogMode.QUIET, buffer_size=10)
+    writer.write(PresetType.MASK_SIMPLE, "mask", "0123456789")
+    assert (tmp_path / "presets" / "maskSimpleShape" / "mask").exists()
+    writer.close()
+
+
+def test_write_summary(tmp_path: Path, capsys):
+    with PresetWriter(tmp_path.as_posix(), LogMode.SUMMARY) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "one", "1")
+        writer.write(PresetType.CROP_RECTANGLE, "two", "2")
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1
+    assert out[0].startswith("created 2 presets (2 bytes)")
+
+
+def test_write_incremental(tmp_path: Path):
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "one", "1")
+        writer.write(PresetType.CROP_RECTANGLE, "two", "2")
+    assert (tmp_path / MANIFEST_NAME).exists()
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "one", "1")
+        writer.write(PresetType.CROP_RECTANGLE, "two", "changed")
+    assert writer.files == 1
+    assert writer.skipped == 1
+    assert (tmp_path / "presets/cropRectangle/two").read_text() == "changed"
+
+
+def test_write_incremental_missing_file(tmp_path: Path):
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "one", "1")
+    (tmp_path / "presets/cropRectangle/one").unlink()
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "one", "1")
+    assert writer.files == 1
+    assert (tmp_path / "presets/cropRectangle/one").exists()
+
+
+def test_write_not_incremental(tmp_path: Path):
+    for _ in range(2):
+        with PresetWriter(
+            tmp_path.as_posix(), LogMode.QUIET, incremental=False
+        ) as writer:
+            writer.write(PresetType.CROP_RECTANGLE, "one", "1")
+        assert writer.files == 1
+
+
+def test_write_threads(tmp_path: Path):
+    writer = PresetWriter(tmp_path.as_posix(), LogMode.QUIET, threads=4, max_pending=2)
+    with writer:
+        for ndx in range(20):
+            writer.write(PresetType.CROP_RECTANGLE, f"preset {ndx}", f"text {ndx}")
+    assert writer.files == 20
+    assert (tmp_path / "presets/cropRectangle/preset+7").read_text() == "text 7"
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET, threads=4) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "preset 7", "text 7")
+    assert writer.skipped == 1
+
+
+def test_write_threads_errors(tmp_path: Path, capsys):
+    # a directory where the preset file should be written
+    (tmp_path / "presets/cropRectangle/bad").mkdir(parents=True)
+    writer = PresetWriter(tmp_path.as_posix(), LogMode.QUIET, threads=2)
+    with pytest.raises(PresetWriteError) as error:
+        with writer:
+            writer.write(PresetType.CROP_RECTANGLE, "good", "1")
+            writer.write(PresetType.CROP_RECTANGLE, "bad", "2")
+    assert [path for path, _ in error.value.errors] == [
+        (tmp_path / "presets/cropRectangle/bad").as_posix()
+    ]
+    assert writer.files == 1
+    assert "could not write preset" in capsys.readouterr().out
+    assert list(writer.manifest.entries) == ["presets/cropRectangle/good"]
+
+
+def test_write_threads_submits_per_file(tmp_path: Path):
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET, threads=2) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "first", "1")
+        # submitted without waiting for a full buffer
+        assert len(writer._pending) == 1
+        writer._pending[0][3].result()
+        assert (tmp_path / "presets/cropRectangle/first").read_text() == "1"
+
+
+def test_write_threads_errors_keep_original(tmp_path: Path):
+    (tmp_path / "presets/cropRectangle/bad").mkdir(parents=True)
+    with pytest.raises(KeyError):
+        with PresetWriter(tmp_path.as_posix(), LogMode.QUIET, threads=2) as writer:
+            writer.write(PresetType.CROP_RECTANGLE, "bad", "2")
+            raise KeyError("render failed")
+    assert len(writer.errors) == 1
+
+
+@pytest.mark.parametrize("threads", [0, 2])
+def test_write_counts_bytes(tmp_path: Path, monkeypatch, threads: int):
+    # newlines are translated like text mode on Windows
+    monkeypatch.setattr(os, "linesep", "\r\n")
+    with PresetWriter(tmp_path.as_posix(), LogMode.QUIET, threads=threads) as writer:
+        writer.write(PresetType.CROP_RECTANGLE, "preset", "a\nb\n")
+    path = tmp_path / "presets/cropRectangle/preset"
+    assert path.read_bytes() == b"a\r\nb\r\n"
+    assert writer.bytes == path.stat().st_size == 6